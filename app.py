@@ -1,5 +1,6 @@
 import streamlit as st
-from auth import init_session_state, login, logout, setup_default_admin
+from auth import init_session_state, login, logout, setup_default_admin, PasswordWorkerBusy
+from backup import start_backup_scheduler
 
 # Page configuration
 st.set_page_config(
@@ -12,6 +13,9 @@ st.set_page_config(
 # Initialize database and default admin
 setup_default_admin()
 
+# Start scheduled backups (no-op unless AI_TRACKER_BACKUP_INTERVAL_HOURS is set)
+start_backup_scheduler()
+
 # Initialize session state
 init_session_state()
 
@@ -58,13 +62,18 @@ with st.form("login_form"):
 
     if submit:
         if username and password:
-            if login(username, password):
-                st.success("Login successful!")
-                if st.session_state.is_admin:
-                    st.switch_page("pages/4_Admin.py")
-                else:
-                    st.switch_page("pages/1_Dashboard.py")
+            try:
+                logged_in = login(username, password)
+            except PasswordWorkerBusy:
+                st.warning("The server is busy right now. Please try again in a moment.")
             else:
-                st.error("Invalid username or password")
+                if logged_in:
+                    st.success("Login successful!")
+                    if st.session_state.is_admin:
+                        st.switch_page("pages/4_Admin.py")
+                    else:
+                        st.switch_page("pages/1_Dashboard.py")
+                else:
+                    st.error("Invalid username or password")
         else:
             st.warning("Please enter both username and password")
@@ -0,0 +1,173 @@
+"""Append-only audit log of every write made through database.py.
+
+    python audit.py --compact   # apply the retention policy once
+
+Each write records the row's before and after images. Records go into an
+in-memory buffer that a background thread appends in batches, so a write
+only pays for a list append. Reads of the history flush first.
+
+History older than AUDIT_RETENTION_DAYS is compacted down to the newest
+record per row, a bounded chunk per short transaction.
+"""
+import argparse
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from storage import get_backend
+from storage.base import current_timestamp
+
+AUDIT_FLUSH_INTERVAL = float(os.environ.get('AI_TRACKER_AUDIT_FLUSH_INTERVAL', 1))
+AUDIT_BATCH_SIZE = int(os.environ.get('AI_TRACKER_AUDIT_BATCH_SIZE', 100))
+# Buffered records kept while the database cannot be written; the oldest
+# beyond this are dropped
+AUDIT_BUFFER_LIMIT = int(os.environ.get('AI_TRACKER_AUDIT_BUFFER_LIMIT', 10000))
+# 0 keeps the full history forever
+AUDIT_RETENTION_DAYS = float(os.environ.get('AI_TRACKER_AUDIT_RETENTION_DAYS', 90))
+AUDIT_COMPACT_INTERVAL_HOURS = 24
+
+# Records deleted per compaction transaction and pause between them, so the
+# write lock is never held for long
+AUDIT_COMPACT_CHUNK = 500
+AUDIT_COMPACT_SLEEP = 0.05
+
+logger = logging.getLogger(__name__)
+
+_buffer = []
+_buffer_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_flusher_lock = threading.Lock()
+_wakeup = threading.Event()
+_flusher_thread = None
+
+def _current_actor():
+    """ID of the user whose Streamlit session runs this thread, if any."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    import streamlit as st
+    return st.session_state.get('user_id')
+
+def record(table_name, row_id, action, before=None, after=None, actor_id=None):
+    """Queue an audit record; images are dicts (or None)."""
+    if actor_id is None:
+        actor_id = _current_actor()
+    item = (
+        table_name, row_id, action, actor_id,
+        json.dumps(before, default=str) if before is not None else None,
+        json.dumps(after, default=str) if after is not None else None,
+        current_timestamp(),
+    )
+    with _buffer_lock:
+        _buffer.append(item)
+        full = len(_buffer) >= AUDIT_BATCH_SIZE
+    _start_flusher()
+    if full:
+        _wakeup.set()
+
+def flush():
+    """Append every buffered record. Returns how many were written."""
+    global _buffer
+    with _flush_lock:
+        with _buffer_lock:
+            records, _buffer = _buffer, []
+        if not records:
+            return 0
+        try:
+            get_backend().append_audit_records(records)
+        except Exception:
+            # Keep the records, in order, for the next attempt
+            with _buffer_lock:
+                _buffer = records + _buffer
+                excess = len(_buffer) - AUDIT_BUFFER_LIMIT
+                if excess > 0:
+                    del _buffer[:excess]
+            if excess > 0:
+                logger.warning("Audit log write failed; dropped the %d oldest of the buffered records", excess)
+            raise
+        return len(records)
+
+def pending():
+    """Records buffered but not yet written."""
+    return len(_buffer)
+
+def _flusher_loop():
+    next_compaction = time.monotonic() + AUDIT_COMPACT_INTERVAL_HOURS * 3600
+    while True:
+        _wakeup.wait(AUDIT_FLUSH_INTERVAL)
+        _wakeup.clear()
+        try:
+            flush()
+            if AUDIT_RETENTION_DAYS > 0 and time.monotonic() >= next_compaction:
+                next_compaction = time.monotonic() + AUDIT_COMPACT_INTERVAL_HOURS * 3600
+                compact()
+        except Exception:
+            # flush() keeps failed records buffered; they go out with the
+            # next batch once the database accepts writes again
+            pass
+
+def _start_flusher():
+    global _flusher_thread
+    if _flusher_thread is not None and _flusher_thread.is_alive():
+        return
+    with _flusher_lock:
+        if _flusher_thread is None or not _flusher_thread.is_alive():
+            _flusher_thread = threading.Thread(target=_flusher_loop, name='ai-tracker-audit', daemon=True)
+            _flusher_thread.start()
+
+def _decode(record):
+    for key in ('before_data', 'after_data'):
+        record[key] = json.loads(record[key]) if record[key] else None
+    return record
+
+def _try_flush():
+    # A failed flush keeps its records buffered; show what is already stored
+    try:
+        flush()
+    except Exception:
+        pass
+
+def get_history(table_name, row_id, limit=50):
+    """Newest first history of one row, images decoded."""
+    _try_flush()
+    return [_decode(r) for r in get_backend().get_audit_history(table_name, row_id, limit)]
+
+def get_recent(table_name, action, limit=50):
+    """Newest first records of one kind of write, images decoded."""
+    _try_flush()
+    return [_decode(r) for r in get_backend().get_recent_audit_records(table_name, action, limit)]
+
+def compact(retention_days=AUDIT_RETENTION_DAYS, chunk=AUDIT_COMPACT_CHUNK, sleep=AUDIT_COMPACT_SLEEP):
+    """Drop superseded history older than retention_days. Returns the count."""
+    flush()
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).strftime('%Y-%m-%d %H:%M:%S')
+    backend = get_backend()
+    total = 0
+    while True:
+        deleted = backend.compact_audit_log(cutoff, chunk)
+        total += deleted
+        if deleted < chunk:
+            return total
+        time.sleep(sleep)
+
+atexit.register(flush)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--compact', action='store_true', help="compact history past the retention period")
+    parser.add_argument('--days', type=float, default=AUDIT_RETENTION_DAYS, help="retention period in days")
+    args = parser.parse_args()
+    if args.compact:
+        # What database.init_db() does; creates audit_log if the app has not
+        # yet run against this database
+        get_backend().init_schema()
+        print(f"Compacted {compact(args.days)} audit records older than {args.days:g} days")
+    else:
+        parser.print_help()
@@ -1,14 +1,51 @@
-import bcrypt
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
-from database import get_user_by_username, create_user, init_db
+import passwords
+from passwords import PasswordWorkerBusy
+from database import (get_user_by_username, create_user, replace_user_password, init_db,
+                      count_new_saved_search_results)
+
+# Stores upgraded hashes, so a busy database never holds up a bcrypt worker
+_rehash_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ai-tracker-rehash')
 
 def hash_password(password):
-    """Hash a password using bcrypt."""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    """Hash a password using bcrypt on the shared worker pool."""
+    return passwords.hash_password(password)
 
 def verify_password(password, hashed_password):
-    """Verify a password against its hash."""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    """Verify a password against its hash on the shared worker pool."""
+    return passwords.verify_password(password, hashed_password)
+
+def _upgrade_hash(user_id, password, verified_hash):
+    """Re-hash at the current cost in the background; skipped if the pool is busy.
+
+    The new hash is only stored if the password is still the verified one,
+    so a reset made in the meantime is never undone.
+    """
+    try:
+        future = passwords.submit_hash(password, timeout=0)
+    except PasswordWorkerBusy:
+        return
+
+    def store(f):
+        # Runs on the bcrypt worker; the write is handed to _rehash_writer
+        if f.exception() is None:
+            _rehash_writer.submit(replace_user_password, user_id, verified_hash, f.result())
+    future.add_done_callback(store)
+
+def authenticate(username, password):
+    """Check credentials and return the user, or None.
+
+    Hashes made with an older, lower cost are upgraded after a successful check.
+    Raises PasswordWorkerBusy if the hashing queue is full.
+    """
+    user = get_user_by_username(username)
+    if not user or not verify_password(password, user['password']):
+        return None
+    if passwords.needs_rehash(user['password']):
+        _upgrade_hash(user['id'], password, user['password'])
+    return user
 
 def init_session_state():
     """Initialize session state variables."""
@@ -25,8 +62,8 @@ def init_session_state():
 
 def login(username, password):
     """Attempt to log in a user."""
-    user = get_user_by_username(username)
-    if user and verify_password(password, user['password']):
+    user = authenticate(username, password)
+    if user:
         st.session_state.logged_in = True
         st.session_state.user = user['username']
         st.session_state.user_id = user['id']
@@ -41,6 +78,8 @@ def logout():
     st.session_state.user_id = None
     st.session_state.is_admin = False
     st.session_state.edit_entry_id = None
+    # Holds plaintext initial passwords until downloaded
+    st.session_state.pop('bulk_import_report', None)
 
 def require_auth():
     """Check if user is authenticated, show warning if not."""
@@ -59,6 +98,10 @@ def render_page_header():
     """Render logout button and user info at the top of every page."""
     if st.session_state.get('logged_in', False):
         col_spacer, col_user, col_logout = st.columns([6, 2, 1])
+        new_results = sum(count_new_saved_search_results(st.session_state.user_id).values())
+        if new_results:
+            with col_spacer:
+                st.markdown(f"🔔 **{new_results}** new in your saved searches")
         with col_user:
             st.markdown(f"Logged in as: **{st.session_state.user}**")
         with col_logout:
@@ -69,6 +112,7 @@ def render_page_header():
 def setup_default_admin():
     """Create default admin user if no users exist."""
     init_db()
+    passwords.start_calibration()
     user = get_user_by_username('admin')
     if not user:
         hashed = hash_password('admin')
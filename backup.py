@@ -0,0 +1,165 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from database import DATABASE_PATH, ensure_data_dir
+from storage import get_backend
+from storage.sqlite import SQLiteBackend
+
+BACKUP_DIR = os.path.join(os.path.dirname(DATABASE_PATH), 'backups')
+SNAPSHOT_PATH = os.path.join(os.path.dirname(DATABASE_PATH), 'snapshot.db')
+
+# Pages copied per backup step. Small steps keep the read lock on the live
+# database short so writers are never held up for long. The sleep only
+# applies when a step finds the database busy or locked.
+BACKUP_PAGES = 256
+BACKUP_SLEEP = 0.005
+
+BACKUP_RETENTION = int(os.environ.get('AI_TRACKER_BACKUP_RETENTION', 7))
+BACKUP_INTERVAL_HOURS = float(os.environ.get('AI_TRACKER_BACKUP_INTERVAL_HOURS', 0))
+SNAPSHOT_MAX_AGE = int(os.environ.get('AI_TRACKER_SNAPSHOT_MAX_AGE', 300))
+
+_snapshot_lock = threading.Lock()
+_scheduler_lock = threading.Lock()
+_scheduler_thread = None
+
+def _copy_database(dest_path):
+    """Copy the live database to dest_path with the online backup API."""
+    # Unique per copy, so concurrent backups never share a temp file
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(dest_path) + '.',
+                                    suffix='.tmp', dir=os.path.dirname(dest_path))
+    os.close(fd)
+    try:
+        src = sqlite3.connect(DATABASE_PATH)
+        dst = sqlite3.connect(tmp_path)
+        try:
+            src.backup(dst, pages=BACKUP_PAGES, sleep=BACKUP_SLEEP)
+        finally:
+            dst.close()
+            src.close()
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    if not verify_backup(tmp_path):
+        os.remove(tmp_path)
+        return None
+    os.replace(tmp_path, dest_path)
+    return dest_path
+
+def verify_backup(path):
+    """Check that a backup file passes SQLite's integrity check."""
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            result = conn.execute('PRAGMA integrity_check').fetchone()
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError:
+        return False
+    return result is not None and result[0] == 'ok'
+
+def backups_supported():
+    """Online backups only apply to the SQLite storage backend."""
+    return get_backend().name == 'sqlite'
+
+def create_backup():
+    """Create a verified, timestamped backup. Returns its path or None."""
+    if not backups_supported() or not os.path.exists(DATABASE_PATH):
+        return None
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    name = datetime.now().strftime('app-%Y%m%d-%H%M%S.db')
+    return _copy_database(os.path.join(BACKUP_DIR, name))
+
+def list_backups():
+    """List backups, newest first."""
+    if not os.path.exists(BACKUP_DIR):
+        return []
+    backups = []
+    for name in os.listdir(BACKUP_DIR):
+        if not (name.startswith('app-') and name.endswith('.db')):
+            continue
+        path = os.path.join(BACKUP_DIR, name)
+        stat = os.stat(path)
+        backups.append({
+            'name': name,
+            'path': path,
+            'size': stat.st_size,
+            'created_at': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
+        })
+    backups.sort(key=lambda b: b['name'], reverse=True)
+    return backups
+
+def rotate_backups(retention=BACKUP_RETENTION):
+    """Delete all but the newest `retention` backups. Returns removed names."""
+    removed = []
+    for backup in list_backups()[retention:]:
+        os.remove(backup['path'])
+        removed.append(backup['name'])
+    return removed
+
+def run_backup(retention=BACKUP_RETENTION):
+    """Create a backup and apply the retention policy."""
+    path = create_backup()
+    if path:
+        rotate_backups(retention)
+    return path
+
+def _scheduler_loop(interval_seconds, retention):
+    while True:
+        time.sleep(interval_seconds)
+        try:
+            run_backup(retention)
+        except (sqlite3.Error, OSError):
+            # A missed backup (database locked, disk full) is simply retried
+            # at the next interval; the previous backups are still there
+            pass
+
+def start_backup_scheduler(interval_hours=BACKUP_INTERVAL_HOURS, retention=BACKUP_RETENTION):
+    """Start the background backup thread once per process (0 disables it)."""
+    global _scheduler_thread
+    if interval_hours <= 0 or not backups_supported():
+        return False
+    with _scheduler_lock:
+        if _scheduler_thread is None or not _scheduler_thread.is_alive():
+            _scheduler_thread = threading.Thread(
+                target=_scheduler_loop,
+                args=(interval_hours * 3600, retention),
+                name='ai-tracker-backup',
+                daemon=True,
+            )
+            _scheduler_thread.start()
+    return True
+
+def refresh_snapshot():
+    """Rebuild the read-only snapshot used by reports and exports."""
+    if not backups_supported() or not os.path.exists(DATABASE_PATH):
+        return None
+    ensure_data_dir()
+    with _snapshot_lock:
+        return _copy_database(SNAPSHOT_PATH)
+
+def get_snapshot_backend(max_age=SNAPSHOT_MAX_AGE):
+    """Read-only backend over a snapshot no older than max_age seconds.
+
+    Heavy report and export reads run here instead of on the live database.
+    Returns None if there is no usable snapshot (other storage backends, no
+    database yet, or a refresh that failed), so callers fall back to the
+    live backend.
+    """
+    if not backups_supported():
+        return None
+    if not os.path.exists(SNAPSHOT_PATH) or time.time() - os.path.getmtime(SNAPSHOT_PATH) > max_age:
+        if refresh_snapshot() is None:
+            return None
+    return SQLiteBackend(SNAPSHOT_PATH, read_only=True)
+
+if __name__ == "__main__":
+    path = run_backup()
+    if path:
+        print(f"Backup written to {path}")
+    else:
+        print("Backup failed or no database to back up")
+        raise SystemExit(1)
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU cache with optional TTL and counters.
+
+    Instances are module-level and therefore shared by every Streamlit
+    session in the process. Every invalidation bumps a generation counter;
+    callers that fill the cache after a slow read pass the generation taken
+    before the read to set(), so a value read before an invalidation is
+    never cached after it.
+    """
+
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.generation = 0
+
+    def get(self, key, default=None):
+        """Return the cached value, or default on a miss or expiry."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, expires_at = item
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, generation=None):
+        """Cache a value, evicting the least recently used entries if full.
+
+        With a generation, nothing is cached if an invalidation happened
+        since it was taken. Returns True if the value was cached.
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def pop(self, key):
+        """Drop one key. Returns True if it was cached."""
+        with self._lock:
+            self.generation += 1
+            if key in self._data:
+                del self._data[key]
+                self.invalidations += 1
+                return True
+            return False
+
+    def pop_where(self, predicate):
+        """Drop every item for which predicate(key, value) is true."""
+        with self._lock:
+            self.generation += 1
+            keys = [key for key, (value, _) in self._data.items() if predicate(key, value)]
+            for key in keys:
+                del self._data[key]
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Counters for admin metrics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
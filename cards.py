@@ -0,0 +1,109 @@
+import html
+import os
+import re
+from collections import namedtuple
+
+from cache import LRUCache
+
+CARD_CACHE_SIZE = int(os.environ.get('AI_TRACKER_CARD_CACHE_SIZE', 2000))
+# Description and remarks longer than this are cut on the card
+CARD_TEXT_LIMIT = 400
+
+YOUTUBE_PATTERNS = [
+    re.compile(r'(?:youtube\.com|youtu\.be|youtube-nocookie\.com)\/(?:watch\?v=|embed\/|v\/|shorts\/)?([a-zA-Z0-9_-]{11})'),
+    re.compile(r'youtu\.be\/([a-zA-Z0-9_-]{11})'),
+]
+
+# Pre-rendered pieces of one entry card. video_kind is 'none', 'iframe'
+# (video is embed HTML), 'video' (a direct file URL) or 'link' (markdown).
+Card = namedtuple('Card', [
+    'header_html', 'video_kind', 'video',
+    'description', 'description_truncated',
+    'remarks', 'remarks_truncated',
+    'date',
+])
+
+# Shared by every session. Keyed by the entry ID plus every field the card
+# is built from, so a card rendered from a stale row (read before an edit,
+# cached after its invalidation) can never be served for the edited entry,
+# even when the edit lands in the same second as the previous updated_at.
+_card_cache = LRUCache(CARD_CACHE_SIZE)
+
+def extract_youtube_id(url):
+    """Extract YouTube video ID from various URL formats."""
+    if not url:
+        return None
+    for pattern in YOUTUBE_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return match.group(1)
+    return None
+
+def _truncate(text, placeholder):
+    if not text:
+        return placeholder, False
+    if len(text) <= CARD_TEXT_LIMIT:
+        return text, False
+    return text[:CARD_TEXT_LIMIT].rstrip() + "…", True
+
+def _render_video(video_link):
+    if not video_link:
+        return 'none', None
+    youtube_id = extract_youtube_id(video_link)
+    if youtube_id:
+        embed_url = f"https://www.youtube.com/embed/{youtube_id}"
+        return 'iframe', f'''<iframe src="{embed_url}" width="100%" height="100%"
+            style="border:0;"
+            allow="accelerometer; autoplay; clipboard-write; encrypted-media;
+            gyroscope; picture-in-picture" allowfullscreen></iframe>'''
+    # For non-YouTube direct video files
+    if video_link.lower().endswith(('.mp4', '.webm', '.ogg')):
+        return 'video', video_link
+    return 'link', f"[Watch Video]({video_link})"
+
+def render_card(entry):
+    """Build the card pieces for an entry (a row with entry attributes)."""
+    website_url = entry.website_address
+    if not website_url.startswith(('http://', 'https://')):
+        website_url = 'https://' + website_url
+    header_html = f'''
+        <div class="entry-card">
+            <p class="website-header">
+                <a href="{html.escape(website_url)}" target="_blank">{html.escape(entry.website_address)}</a>
+            </p>
+        </div>
+    '''
+    video_kind, video = _render_video(entry.video_link)
+    description, description_truncated = _truncate(entry.description, "No description")
+    remarks, remarks_truncated = _truncate(entry.remarks, "No remarks")
+    return Card(
+        header_html=header_html,
+        video_kind=video_kind,
+        video=video,
+        description=description,
+        description_truncated=description_truncated,
+        remarks=remarks,
+        remarks_truncated=remarks_truncated,
+        date=entry.created_at[:10] if entry.created_at else "N/A",
+    )
+
+def _card_key(entry):
+    return (int(entry.id), entry.updated_at, entry.website_address, entry.video_link,
+            entry.description, entry.remarks, entry.created_at)
+
+def get_card(entry):
+    """Cached card for an entry, keyed by its ID and rendered fields."""
+    key = _card_key(entry)
+    card = _card_cache.get(key)
+    if card is None:
+        card = render_card(entry)
+        _card_cache.set(key, card)
+    return card
+
+def invalidate_card(entry_id):
+    """Drop every cached card of an entry."""
+    _card_cache.pop_where(lambda key, _: key[0] == entry_id)
+
+def get_card_cache_stats():
+    """Hit/miss/eviction counters of the card cache."""
+    return _card_cache.stats()
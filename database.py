@@ -1,9 +1,32 @@
-import sqlite3
 import os
-from datetime import datetime
-from contextlib import contextmanager
+import json
+import audit
+from cache import LRUCache
+from cards import invalidate_card
+from searches import entry_matches
+from storage import get_backend
 
-DATABASE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'app.db')
+DATABASE_PATH = os.environ.get(
+    'AI_TRACKER_DATABASE_PATH',
+    os.path.join(os.path.dirname(__file__), 'data', 'app.db')
+)
+
+# Rows fetched per cursor read when building columnar results
+FETCH_CHUNK_SIZE = 500
+ENTRY_COLUMN_DTYPES = {
+    'id': 'int64',
+    'creator_name': 'category',
+}
+
+# Process-wide user directory. Rows are cached under ('id', id) and
+# ('username', name); ('all',) holds the get_all_users() list.
+USER_CACHE_SIZE = int(os.environ.get('AI_TRACKER_USER_CACHE_SIZE', 1024))
+USER_CACHE_TTL = float(os.environ.get('AI_TRACKER_USER_CACHE_TTL', 300))
+_user_cache = LRUCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+# Columns kept in audit images; password hashes never enter the audit log
+USER_AUDIT_FIELDS = ('id', 'username', 'is_admin', 'created_at')
+ENTRY_AUDIT_FIELDS = ('website_address', 'video_link', 'description', 'remarks')
 
 def ensure_data_dir():
     """Ensure the data directory exists."""
@@ -11,165 +34,256 @@ def ensure_data_dir():
     if not os.path.exists(data_dir):
         os.makedirs(data_dir)
 
-@contextmanager
-def get_db_connection():
-    """Context manager for database connections."""
-    ensure_data_dir()
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-    finally:
-        conn.close()
-
 def init_db():
-    """Initialize the database with tables and default admin user."""
-    ensure_data_dir()
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-
-        # Create users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                is_admin INTEGER DEFAULT 0,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Create entries table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS entries (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                website_address TEXT NOT NULL,
-                video_link TEXT,
-                description TEXT,
-                remarks TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                created_by INTEGER,
-                FOREIGN KEY (created_by) REFERENCES users(id)
-            )
-        ''')
-
-        conn.commit()
+    """Initialize the configured storage backend's tables."""
+    get_backend().init_schema()
 
 # ============== User Operations ==============
 
+def _cache_user(user, generation):
+    # Skipped if the user was invalidated while the row was being read
+    if _user_cache.set(('id', user['id']), user, generation):
+        _user_cache.set(('username', user['username']), user, generation)
+
+def _invalidate_user(user_id):
+    _user_cache.pop_where(lambda key, value: key[0] != 'all' and value['id'] == user_id)
+    _user_cache.pop(('all',))
+
+def get_user_cache_stats():
+    """Hit/miss counters of the user directory cache."""
+    return _user_cache.stats()
+
+def _user_image(user):
+    return {f: user.get(f) for f in USER_AUDIT_FIELDS} if user else None
+
 def get_user_by_username(username):
     """Get a user by username."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE username = ?', (username,))
-        row = cursor.fetchone()
-        if row:
-            return dict(row)
-        return None
+    user = _user_cache.get(('username', username))
+    if user is None:
+        generation = _user_cache.generation
+        user = get_backend().get_user_by_username(username)
+        if user is None:
+            return None
+        _cache_user(user, generation)
+    return dict(user)
 
 def get_user_by_id(user_id):
     """Get a user by ID."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
-        row = cursor.fetchone()
-        if row:
-            return dict(row)
-        return None
+    user = _user_cache.get(('id', user_id))
+    if user is None:
+        generation = _user_cache.generation
+        user = get_backend().get_user_by_id(user_id)
+        if user is None:
+            return None
+        _cache_user(user, generation)
+    return dict(user)
 
 def get_all_users():
     """Get all users."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, username, is_admin, created_at FROM users ORDER BY created_at DESC')
-        return [dict(row) for row in cursor.fetchall()]
+    users = _user_cache.get(('all',))
+    if users is None:
+        generation = _user_cache.generation
+        users = get_backend().get_all_users()
+        _user_cache.set(('all',), users, generation)
+    return [dict(u) for u in users]
 
 def create_user(username, hashed_password, is_admin=0):
     """Create a new user."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                'INSERT INTO users (username, password, is_admin) VALUES (?, ?, ?)',
-                (username, hashed_password, is_admin)
-            )
-            conn.commit()
-            return cursor.lastrowid
-        except sqlite3.IntegrityError:
-            return None
+    user_id = get_backend().create_user(username, hashed_password, is_admin)
+    if user_id:
+        _user_cache.pop(('all',))
+        audit.record('users', user_id, 'create', after={'id': user_id, 'username': username, 'is_admin': is_admin})
+    return user_id
+
+def create_users_bulk(users):
+    """Create (username, hashed_password, is_admin) users in one transaction.
+
+    Returns the new ID per row, or None where the username already exists.
+    """
+    user_ids = get_backend().create_users_bulk(users)
+    if any(user_ids):
+        _user_cache.pop(('all',))
+    for (username, _, is_admin), user_id in zip(users, user_ids):
+        if user_id:
+            audit.record('users', user_id, 'create', after={'id': user_id, 'username': username, 'is_admin': is_admin})
+    return user_ids
 
 def update_user_password(user_id, hashed_password):
     """Update a user's password."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            'UPDATE users SET password = ? WHERE id = ?',
-            (hashed_password, user_id)
-        )
-        conn.commit()
-        return cursor.rowcount > 0
+    success = get_backend().update_user_password(user_id, hashed_password)
+    _invalidate_user(user_id)
+    if success:
+        audit.record('users', user_id, 'password')
+    return success
+
+def replace_user_password(user_id, expected_hash, hashed_password):
+    """Replace a password hash only if it is still expected_hash."""
+    success = get_backend().replace_user_password(user_id, expected_hash, hashed_password)
+    _invalidate_user(user_id)
+    if success:
+        audit.record('users', user_id, 'rehash')
+    return success
 
 def delete_user(user_id):
     """Delete a user."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM users WHERE id = ?', (user_id,))
-        conn.commit()
-        return cursor.rowcount > 0
+    before = get_backend().delete_user(user_id)
+    _invalidate_user(user_id)
+    if before is None:
+        return False
+    audit.record('users', user_id, 'delete', before=_user_image(before))
+    return True
 
 # ============== Entry Operations ==============
 
 def get_all_entries():
     """Get all entries."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT e.*, u.username as creator_name
-            FROM entries e
-            LEFT JOIN users u ON e.created_by = u.id
-            ORDER BY e.created_at DESC
-        ''')
-        return [dict(row) for row in cursor.fetchall()]
+    return get_backend().get_all_entries()
+
+def get_entries_frame(chunk_size=FETCH_CHUNK_SIZE):
+    """Get all entries as a pandas DataFrame, or None if there are none.
+
+    Columns are filled straight from chunked cursor reads instead of going
+    through a dict per row, and repetitive columns are stored as categoricals.
+    """
+    names = None
+    columns = None
+    for chunk_names, rows in get_backend().iter_entry_chunks(chunk_size):
+        if columns is None:
+            names = chunk_names
+            columns = [[] for _ in names]
+        for column, values in zip(columns, zip(*rows)):
+            column.extend(values)
+    if columns is None:
+        return None
+
+    import pandas as pd  # deferred: only needed once there are rows
+    # Text columns stay object dtype so missing values remain None
+    return pd.DataFrame({
+        name: pd.Series(values, dtype=ENTRY_COLUMN_DTYPES.get(name, object))
+        for name, values in zip(names, columns)
+    })
+
+def get_entries_generation():
+    """Token that changes whenever entries change (for publishers and pollers)."""
+    return get_backend().get_entries_generation()
 
 def get_entry_by_id(entry_id):
     """Get an entry by ID."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM entries WHERE id = ?', (entry_id,))
-        row = cursor.fetchone()
-        if row:
-            return dict(row)
-        return None
+    return get_backend().get_entry_by_id(entry_id)
 
 def create_entry(website_address, video_link, description, remarks, created_by):
     """Create a new entry."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO entries (website_address, video_link, description, remarks, created_by)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (website_address, video_link, description, remarks, created_by))
-        conn.commit()
-        return cursor.lastrowid
-
-def update_entry(entry_id, website_address, video_link, description, remarks):
+    entry_id = get_backend().create_entry(website_address, video_link, description, remarks, created_by)
+    if entry_id:
+        audit.record('entries', entry_id, 'create', after={
+            'website_address': website_address, 'video_link': video_link,
+            'description': description, 'remarks': remarks, 'created_by': created_by,
+        }, actor_id=created_by)
+        _update_saved_search_matches(entry_id)
+    return entry_id
+
+def update_entry(entry_id, website_address, video_link, description, remarks, action='update'):
     """Update an existing entry."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE entries
-            SET website_address = ?, video_link = ?, description = ?, remarks = ?,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (website_address, video_link, description, remarks, entry_id))
-        conn.commit()
-        return cursor.rowcount > 0
+    before = get_backend().update_entry(entry_id, website_address, video_link, description, remarks)
+    invalidate_card(entry_id)
+    if before is None:
+        return False
+    audit.record('entries', entry_id, action,
+                 before={f: before[f] for f in ENTRY_AUDIT_FIELDS},
+                 after={'website_address': website_address, 'video_link': video_link,
+                        'description': description, 'remarks': remarks})
+    _update_saved_search_matches(entry_id)
+    return True
 
 def delete_entry(entry_id):
     """Delete an entry."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM entries WHERE id = ?', (entry_id,))
-        conn.commit()
-        return cursor.rowcount > 0
+    before = get_backend().delete_entry(entry_id)
+    invalidate_card(entry_id)
+    if before is None:
+        return False
+    # The full row, so the entry can be restored under its old ID
+    audit.record('entries', entry_id, 'delete', before=before)
+    return True
+
+# ============== History ==============
+
+def get_entry_history(entry_id, limit=50):
+    """Get an entry's audit records, newest first."""
+    return audit.get_history('entries', entry_id, limit)
+
+def get_deleted_entries(limit=50):
+    """Get the last delete record of each entry that is still deleted, newest first."""
+    backend = get_backend()
+    deleted = {}
+    for record in audit.get_recent('entries', 'delete', limit):
+        if record['row_id'] not in deleted and backend.get_entry_by_id(record['row_id']) is None:
+            deleted[record['row_id']] = record
+    return list(deleted.values())
+
+def restore_entry_version(entry_id, image):
+    """Set an entry's fields back to an audited image."""
+    return update_entry(entry_id, *(image.get(f) for f in ENTRY_AUDIT_FIELDS), action='restore')
+
+def restore_deleted_entry(record):
+    """Re-create a deleted entry from its delete record, under its old ID."""
+    entry = record['before_data']
+    entry_id = get_backend().restore_entry(entry)
+    if entry_id:
+        audit.record('entries', entry_id, 'restore', after={f: entry.get(f) for f in ENTRY_AUDIT_FIELDS})
+        invalidate_card(entry_id)
+        _update_saved_search_matches(entry_id)
+    return entry_id
+
+# ============== Saved Searches ==============
+
+def _parse_search(search):
+    search['filters'] = json.loads(search['filters'])
+    return search
+
+def _matcher(filters):
+    return lambda entry: entry_matches(filters, entry)
+
+def _update_saved_search_matches(entry_id):
+    """Re-evaluate every saved search against one created or changed entry.
+
+    Searches saved after this point scan the entry themselves, so only the
+    ones known now are touched.
+    """
+    backend = get_backend()
+    searches = backend.get_saved_searches()
+    if searches:
+        backend.refresh_saved_search_matches(
+            entry_id, {s['id']: _matcher(json.loads(s['filters'])) for s in searches}
+        )
+
+def get_saved_searches(user_id):
+    """Get a user's saved searches, with filters decoded."""
+    return [_parse_search(s) for s in get_backend().get_saved_searches(user_id)]
+
+def create_saved_search(user_id, name, filters):
+    """Save a search and materialize its current results."""
+    search_id = get_backend().create_saved_search(
+        user_id, name, json.dumps(filters, sort_keys=True), _matcher(filters)
+    )
+    if search_id:
+        audit.record('saved_searches', search_id, 'create', after={'name': name, 'filters': filters})
+    return search_id
+
+def delete_saved_search(search_id):
+    """Delete a saved search."""
+    success = get_backend().delete_saved_search(search_id)
+    if success:
+        audit.record('saved_searches', search_id, 'delete')
+    return success
+
+def mark_saved_search_visited(search_id):
+    """Mark a saved search's current results as seen."""
+    return get_backend().mark_saved_search_visited(search_id)
+
+def get_saved_search_result_ids(search_id):
+    """Get the IDs of the entries matching a saved search."""
+    return get_backend().get_saved_search_result_ids(search_id)
+
+def count_new_saved_search_results(user_id):
+    """Get {search_id: new results since the last visit} for a user."""
+    return get_backend().count_new_saved_search_results(user_id)
@@ -1,9 +1,10 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import pandas as pd
-import re
 from auth import init_session_state, require_auth, render_page_header
-from database import get_all_entries
+from database import (get_entries_frame, get_entries_generation, get_saved_searches, create_saved_search,
+                      delete_saved_search, mark_saved_search_visited, count_new_saved_search_results)
+from cards import get_card
+from searches import SEARCH_KEYS, has_filters
 
 # Initialize session state
 init_session_state()
@@ -48,162 +49,229 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def extract_youtube_id(url):
-    """Extract YouTube video ID from various URL formats."""
-    if not url:
-        return None
-    patterns = [
-        r'(?:youtube\.com|youtu\.be|youtube-nocookie\.com)\/(?:watch\?v=|embed\/|v\/|shorts\/)?([a-zA-Z0-9_-]{11})',
-        r'youtu\.be\/([a-zA-Z0-9_-]{11})',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
-
-def render_video(video_link):
-    """Render video embed or link."""
-    if not video_link:
-        st.write("No video")
-        return
-
-    youtube_id = extract_youtube_id(video_link)
-    if youtube_id:
-        embed_url = f"https://www.youtube.com/embed/{youtube_id}"
-        video_html = f'''<iframe src="{embed_url}" width="100%" height="100%"
-            style="border:0;"
-            allow="accelerometer; autoplay; clipboard-write; encrypted-media;
-            gyroscope; picture-in-picture" allowfullscreen></iframe>'''
-        components.html(video_html, height=220)
+def render_video(card):
+    """Render the card's video embed or link."""
+    if card.video_kind == 'iframe':
+        components.html(card.video, height=220)
+    elif card.video_kind == 'video':
+        st.video(card.video)
+    elif card.video_kind == 'link':
+        st.markdown(card.video)
     else:
-        # For non-YouTube direct video files
-        if video_link.lower().endswith(('.mp4', '.webm', '.ogg')):
-            st.video(video_link)
-        else:
-            st.markdown(f"[Watch Video]({video_link})")
-
-def main():
-    st.title("📊 Dashboard")
-    st.markdown("View and search all tracked AI agents and websites.")
-    st.markdown("---")
-
-    # Get all entries
-    entries = get_all_entries()
-
-    if not entries:
-        st.info("No entries yet. Go to 'Add Entry' to create your first entry!")
-        return
+        st.write("No video")
 
-    # Convert to DataFrame for filtering
-    df = pd.DataFrame(entries)
+SORT_COLUMN_MAP = {
+    "Date": "created_at",
+    "Website": "website_address",
+    "Description": "description",
+    "Remarks": "remarks"
+}
 
-    # Filter section
-    st.markdown("### 🔍 Search & Filter")
+def filter_bar():
+    """Render the filter form and return the applied (submitted) filters.
 
-    col1, col2, col3, col4 = st.columns(4)
+    All inputs sit in one form, so typing does not rerun anything; the whole
+    batch is applied at once on Apply or Enter.
+    """
+    with st.form("filter_form", border=False):
+        col1, col2, col3, col4 = st.columns(4)
 
-    with col1:
-        filter_website = st.text_input("Filter by Website", key="filter_website",
-                                        placeholder="Type to filter...")
-    with col2:
-        filter_description = st.text_input("Filter by Description", key="filter_desc",
+        with col1:
+            filter_website = st.text_input("Filter by Website", key="filter_website",
+                                            placeholder="Type to filter...")
+        with col2:
+            filter_description = st.text_input("Filter by Description", key="filter_desc",
+                                                placeholder="Type to filter...")
+        with col3:
+            filter_remarks = st.text_input("Filter by Remarks", key="filter_remarks",
                                             placeholder="Type to filter...")
-    with col3:
-        filter_remarks = st.text_input("Filter by Remarks", key="filter_remarks",
-                                        placeholder="Type to filter...")
-    with col4:
-        filter_date = st.text_input("Filter by Date", key="filter_date",
-                                     placeholder="e.g., 2026-01-")
-
-    # Sort options
-    col_sort1, col_sort2 = st.columns(2)
-    with col_sort1:
-        sort_by = st.selectbox("Sort by", ["Date", "Website", "Description", "Remarks"],
-                               key="sort_by")
-    with col_sort2:
-        sort_order = st.selectbox("Order", ["Descending", "Ascending"], key="sort_order")
-
-    # Apply filters
-    filtered_df = df.copy()
-
-    if filter_website:
-        filtered_df = filtered_df[
-            filtered_df['website_address'].str.lower().str.contains(filter_website.lower(), na=False)
-        ]
-
-    if filter_description:
-        filtered_df = filtered_df[
-            filtered_df['description'].str.lower().str.contains(filter_description.lower(), na=False)
-        ]
-
-    if filter_remarks:
-        filtered_df = filtered_df[
-            filtered_df['remarks'].str.lower().str.contains(filter_remarks.lower(), na=False)
-        ]
+        with col4:
+            filter_date = st.text_input("Filter by Date", key="filter_date",
+                                         placeholder="e.g., 2026-01-")
+
+        # Sort options
+        col_sort1, col_sort2, col_apply = st.columns([3, 3, 1])
+        with col_sort1:
+            sort_by = st.selectbox("Sort by", list(SORT_COLUMN_MAP), key="sort_by")
+        with col_sort2:
+            sort_order = st.selectbox("Order", ["Descending", "Ascending"], key="sort_order")
+        with col_apply:
+            st.form_submit_button("🔍 Apply", type="primary", use_container_width=True)
+
+    return (filter_website, filter_description, filter_remarks, filter_date, sort_by, sort_order)
+
+def saved_searches_bar():
+    """Load, save and delete the current user's saved searches.
+
+    Loading writes the saved values into the filter widgets' state, so it
+    must run before filter_bar() renders them.
+    """
+    user_id = st.session_state.user_id
+    searches = {s['id']: s for s in get_saved_searches(user_id)}
+    new_counts = count_new_saved_search_results(user_id)
+
+    with st.expander("⭐ Saved Searches", expanded=bool(new_counts)):
+        if searches:
+            col_pick, col_load, col_delete = st.columns([4, 1, 1])
+            with col_pick:
+                search_id = st.selectbox(
+                    "Saved search", list(searches), key="saved_search_id",
+                    format_func=lambda i: searches[i]['name'] + (f" ({new_counts[i]} new)" if i in new_counts else ""),
+                )
+            with col_load:
+                st.markdown("&nbsp;")
+                if st.button("📂 Load", use_container_width=True):
+                    for key, value in searches[search_id]['filters'].items():
+                        st.session_state[key] = value
+                    mark_saved_search_visited(search_id)
+                    # Full rerun so the page header's count is refreshed too
+                    st.rerun()
+            with col_delete:
+                st.markdown("&nbsp;")
+                if st.button("🗑️ Delete", use_container_width=True):
+                    delete_saved_search(search_id)
+                    st.rerun()
+        else:
+            st.caption("No saved searches yet. Apply some filters and save them here.")
+
+        col_name, col_save = st.columns([5, 1])
+        with col_name:
+            name = st.text_input("Save the applied filters as", key="saved_search_name",
+                                 placeholder="e.g., Coding assistants")
+        with col_save:
+            st.markdown("&nbsp;")
+            if st.button("💾 Save", use_container_width=True):
+                filters = {key: st.session_state.get(key, "") for key in SEARCH_KEYS}
+                name = name.strip()
+                if not name:
+                    st.error("Please enter a name for the search.")
+                elif not has_filters(filters):
+                    st.error("Please apply at least one filter first.")
+                elif any(s['name'] == name for s in searches.values()):
+                    st.error(f"You already have a saved search named '{name}'.")
+                else:
+                    create_saved_search(user_id, name, filters)
+                    st.rerun()
+
+def filtered_order(df, generation, filters):
+    """Index of the matching rows in display order.
+
+    Memoized per session on the entries generation, so reruns with unchanged
+    entries and filters skip the work without keeping the frame alive.
+    """
+    memo = st.session_state.get('dashboard_order')
+    if memo and memo[0] == generation and memo[1] == filters:
+        return memo[2]
+
+    filter_website, filter_description, filter_remarks, filter_date, sort_by, sort_order = filters
+
+    # Apply filters as boolean masks so the frame itself is never copied
+    text_filters = [
+        ('website_address', filter_website),
+        ('description', filter_description),
+        ('remarks', filter_remarks),
+    ]
+    mask = None
+    for column, value in text_filters:
+        if value:
+            matches = df[column].str.contains(value, case=False, regex=False, na=False)
+            mask = matches if mask is None else mask & matches
 
     if filter_date:
-        filtered_df = filtered_df[
-            filtered_df['created_at'].str.contains(filter_date, na=False)
-        ]
+        matches = df['created_at'].str.contains(filter_date, regex=False, na=False)
+        mask = matches if mask is None else mask & matches
 
     # Apply sorting
-    sort_column_map = {
-        "Date": "created_at",
-        "Website": "website_address",
-        "Description": "description",
-        "Remarks": "remarks"
-    }
-    sort_col = sort_column_map[sort_by]
+    sort_col = SORT_COLUMN_MAP[sort_by]
     ascending = sort_order == "Ascending"
-    filtered_df = filtered_df.sort_values(by=sort_col, ascending=ascending, na_position='last')
+    sort_values = df[sort_col] if mask is None else df.loc[mask, sort_col]
+    order = sort_values.sort_values(ascending=ascending, na_position='last').index
+
+    st.session_state.dashboard_order = (generation, filters, order)
+    return order
+
+def entry_actions(entry_id):
+    """Edit button that switches to the Edit page."""
+    if st.button("✏️ Edit", key=f"edit_{entry_id}"):
+        st.session_state.edit_entry_id = entry_id
+        st.switch_page("pages/3_Edit_Entry.py")
+
+def render_entry(row):
+    """Render one entry card from the shared card cache."""
+    card = get_card(row)
+    with st.container():
+        # Website header
+        st.markdown(card.header_html, unsafe_allow_html=True)
+
+        # Content columns
+        col_video, col_desc, col_remarks, col_date, col_action = st.columns([2, 2, 2, 1, 1])
+
+        with col_video:
+            st.markdown("**Video**")
+            render_video(card)
+
+        with col_desc:
+            st.markdown("**Description**")
+            st.write(card.description)
+            if card.description_truncated:
+                with st.expander("Show full description"):
+                    st.write(row.description)
+
+        with col_remarks:
+            st.markdown("**Remarks**")
+            st.write(card.remarks)
+            if card.remarks_truncated:
+                with st.expander("Show full remarks"):
+                    st.write(row.remarks)
+
+        with col_date:
+            st.markdown("**Date**")
+            st.write(card.date)
+
+        with col_action:
+            st.markdown("**Action**")
+            entry_actions(int(row.id))
+
+        st.markdown("---")
+
+@st.fragment
+def results_view(df, generation):
+    """Filter bar and result list.
+
+    Applying filters reruns only this fragment: the page header, CSS and the
+    entry fetch in main() are not re-executed, unless entries changed since
+    df was fetched.
+    """
+    if get_entries_generation() != generation:
+        st.rerun()
+
+    st.markdown("### 🔍 Search & Filter")
+    saved_searches_bar()
+    filters = filter_bar()
+    order = filtered_order(df, generation, filters)
+
+    st.markdown("---")
+    st.markdown(f"### Showing {len(order)} of {len(df)} entries")
+
+    # Display entries; only the matching rows are materialized, in sort order
+    for row in df.loc[order].itertuples(index=False):
+        render_entry(row)
 
+def main():
+    st.title("📊 Dashboard")
+    st.markdown("View and search all tracked AI agents and websites.")
     st.markdown("---")
-    st.markdown(f"### Showing {len(filtered_df)} of {len(df)} entries")
-
-    # Display entries
-    for _, row in filtered_df.iterrows():
-        with st.container():
-            # Website header
-            website_url = row['website_address']
-            if not website_url.startswith(('http://', 'https://')):
-                website_url = 'https://' + website_url
-
-            st.markdown(f'''
-                <div class="entry-card">
-                    <p class="website-header">
-                        <a href="{website_url}" target="_blank">{row['website_address']}</a>
-                    </p>
-                </div>
-            ''', unsafe_allow_html=True)
-
-            # Content columns
-            col_video, col_desc, col_remarks, col_date, col_action = st.columns([2, 2, 2, 1, 1])
-
-            with col_video:
-                st.markdown("**Video**")
-                render_video(row['video_link'])
-
-            with col_desc:
-                st.markdown("**Description**")
-                st.write(row['description'] if row['description'] else "No description")
-
-            with col_remarks:
-                st.markdown("**Remarks**")
-                st.write(row['remarks'] if row['remarks'] else "No remarks")
-
-            with col_date:
-                st.markdown("**Date**")
-                date_str = row['created_at'][:10] if row['created_at'] else "N/A"
-                st.write(date_str)
-
-            with col_action:
-                st.markdown("**Action**")
-                if st.button("✏️ Edit", key=f"edit_{row['id']}"):
-                    st.session_state.edit_entry_id = row['id']
-                    st.switch_page("pages/3_Edit_Entry.py")
-
-            st.markdown("---")
+
+    # Get all entries as a DataFrame built directly from the cursor; the
+    # generation is read first, so a write in between only causes a refetch
+    generation = get_entries_generation()
+    df = get_entries_frame()
+
+    if df is None:
+        st.info("No entries yet. Go to 'Add Entry' to create your first entry!")
+        return
+
+    results_view(df, generation)
 
 if __name__ == "__main__":
     main()
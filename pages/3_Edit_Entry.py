@@ -1,6 +1,8 @@
 import streamlit as st
 from auth import init_session_state, require_auth, render_page_header
-from database import get_all_entries, get_entry_by_id, update_entry, delete_entry
+from database import (get_all_entries, get_entry_by_id, update_entry, delete_entry, get_all_users,
+                      get_entry_history, get_deleted_entries, restore_entry_version, restore_deleted_entry,
+                      ENTRY_AUDIT_FIELDS)
 
 # Initialize session state
 init_session_state()
@@ -18,6 +20,59 @@ require_auth()
 # Page header with logout
 render_page_header()
 
+FIELD_LABELS = {
+    'website_address': "Website Address",
+    'video_link': "Video Link",
+    'description': "Description",
+    'remarks': "Remarks",
+}
+
+def history_section(entry):
+    """The entry's change history, with a restore button per earlier version."""
+    history = get_entry_history(entry['id'])
+    with st.expander(f"🕘 History ({len(history)})"):
+        if not history:
+            st.caption("No recorded changes yet.")
+            return
+        usernames = {u['id']: u['username'] for u in get_all_users()}
+        current = {f: entry[f] for f in ENTRY_AUDIT_FIELDS}
+        for record in history:
+            actor = usernames.get(record['actor_id'], "unknown user")
+            st.markdown(f"**{record['created_at']}** · {record['action']} by {actor}")
+            before = record['before_data'] or {}
+            after = record['after_data'] or {}
+            for field in ENTRY_AUDIT_FIELDS:
+                if field in after and before.get(field) != after[field]:
+                    st.caption(f"{FIELD_LABELS[field]}: {before.get(field) or '—'} → {after[field] or '—'}")
+            version = {f: after.get(f) for f in ENTRY_AUDIT_FIELDS}
+            if after and version != current:
+                if st.button("↩️ Restore this version", key=f"restore_version_{record['id']}"):
+                    if restore_entry_version(entry['id'], version):
+                        st.success("✅ Version restored!")
+                        st.rerun()
+                    else:
+                        st.error("Failed to restore this version.")
+
+def deleted_entries_section():
+    """Recently deleted entries, each restorable under its old ID."""
+    deleted = get_deleted_entries()
+    if not deleted:
+        return
+    with st.expander(f"♻️ Recently Deleted ({len(deleted)})"):
+        for record in deleted:
+            col_info, col_restore = st.columns([5, 1])
+            with col_info:
+                st.markdown(f"**{record['before_data']['website_address']}** (ID: {record['row_id']})")
+                st.caption(f"Deleted: {record['created_at']}")
+            with col_restore:
+                if st.button("♻️ Restore", key=f"restore_deleted_{record['id']}"):
+                    if restore_deleted_entry(record):
+                        st.session_state.edit_entry_id = record['row_id']
+                        st.success("✅ Entry restored!")
+                        st.rerun()
+                    else:
+                        st.error("Failed to restore the entry.")
+
 def main():
     st.title("✏️ Edit Entry")
     st.markdown("Modify or delete existing entries.")
@@ -28,6 +83,7 @@ def main():
 
     if not entries:
         st.info("No entries to edit. Go to 'Add Entry' to create your first entry!")
+        deleted_entries_section()
         return
 
     # Create a mapping for the selectbox
@@ -119,6 +175,8 @@ def main():
                 else:
                     st.error("Failed to update entry. Please try again.")
 
+    history_section(entry)
+
     # Delete section (outside form)
     st.markdown("---")
     st.markdown("### ⚠️ Danger Zone")
@@ -132,7 +190,8 @@ def main():
             st.session_state.confirm_delete = True
             st.rerun()
     else:
-        st.warning(f"Are you sure you want to delete **{entry['website_address']}**? This cannot be undone!")
+        st.warning(f"Are you sure you want to delete **{entry['website_address']}**? "
+                   f"It can be restored from Recently Deleted.")
         col1, col2 = st.columns(2)
         with col1:
             if st.button("✅ Yes, Delete", type="primary"):
@@ -149,5 +208,7 @@ def main():
                 st.session_state.confirm_delete = False
                 st.rerun()
 
+    deleted_entries_section()
+
 if __name__ == "__main__":
     main()
@@ -1,7 +1,10 @@
+import os
 import streamlit as st
-import pandas as pd
-from auth import init_session_state, require_admin, hash_password, render_page_header
-from database import get_all_users, create_user, update_user_password, delete_user, get_user_by_id
+from auth import init_session_state, require_admin, hash_password, render_page_header, PasswordWorkerBusy
+from database import get_all_users, create_user, update_user_password, delete_user, get_user_cache_stats
+from cards import get_card_cache_stats
+from backup import backups_supported, list_backups, run_backup, BACKUP_RETENTION
+from provisioning import parse_users_csv, provision_users, download_credentials_once, BULK_USER_LIMIT
 
 # Initialize session state
 init_session_state()
@@ -31,6 +34,7 @@ def main():
     st.markdown("### 👥 All Users")
 
     if users:
+        import pandas as pd  # deferred so the permission check stays cheap
         df = pd.DataFrame(users)
         df['is_admin'] = df['is_admin'].apply(lambda x: "✅ Yes" if x else "❌ No")
         df = df.rename(columns={
@@ -43,10 +47,22 @@ def main():
     else:
         st.info("No users found.")
 
+    with st.expander("📈 Caches"):
+        for title, stats in (("User directory", get_user_cache_stats()),
+                             ("Entry cards", get_card_cache_stats())):
+            st.markdown(f"**{title}**")
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Hit Rate", f"{stats['hit_rate']:.0%}")
+            col2.metric("Hits", stats['hits'])
+            col3.metric("Misses", stats['misses'])
+            col4.metric("Cached", f"{stats['size']} / {stats['maxsize']}")
+            st.caption(f"Evictions: {stats['evictions']} | Invalidations: {stats['invalidations']}")
+
     st.markdown("---")
 
     # Tabs for different admin actions
-    tab1, tab2, tab3 = st.tabs(["➕ Create User", "🔑 Change Password", "🗑️ Delete User"])
+    tab1, tab_bulk, tab2, tab3, tab4 = st.tabs(["➕ Create User", "📥 Bulk Import", "🔑 Change Password",
+                                                "🗑️ Delete User", "💾 Backups"])
 
     with tab1:
         st.markdown("### Create New User")
@@ -66,14 +82,81 @@ def main():
                 elif len(new_password) < 4:
                     st.error("Password must be at least 4 characters!")
                 else:
-                    hashed = hash_password(new_password)
-                    user_id = create_user(new_username, hashed, is_admin=1 if is_admin else 0)
+                    try:
+                        hashed = hash_password(new_password)
+                    except PasswordWorkerBusy:
+                        st.warning("The server is busy hashing passwords. Please try again in a moment.")
+                    else:
+                        user_id = create_user(new_username, hashed, is_admin=1 if is_admin else 0)
 
-                    if user_id:
-                        st.success(f"✅ User '{new_username}' created successfully!")
-                        st.rerun()
+                        if user_id:
+                            st.success(f"✅ User '{new_username}' created successfully!")
+                            st.rerun()
+                        else:
+                            st.error(f"Failed to create user. Username '{new_username}' may already exist.")
+
+    with tab_bulk:
+        st.markdown("### Bulk Import Users")
+        st.caption(f"Upload a CSV with a header row and the columns `username`, `role` (`user` or `admin`, "
+                   f"default `user`) and `password` (generated when empty). Up to {BULK_USER_LIMIT} users "
+                   f"are created in one go.")
+
+        with st.form("bulk_import_form"):
+            uploaded = st.file_uploader("Users CSV", type="csv")
+            submit = st.form_submit_button("📥 Import Users", type="primary")
+
+            if submit:
+                if uploaded is None:
+                    st.error("Please choose a CSV file!")
+                else:
+                    try:
+                        rows, rejected = parse_users_csv(uploaded.getvalue().decode('utf-8-sig'))
+                    except (ValueError, UnicodeDecodeError) as exc:
+                        st.error(f"Could not read the CSV: {exc}")
                     else:
-                        st.error(f"Failed to create user. Username '{new_username}' may already exist.")
+                        created = 0
+                        try:
+                            if rows:
+                                with st.spinner(f"Hashing {len(rows)} passwords..."):
+                                    created = provision_users(rows)
+                        except Exception as exc:
+                            st.error(f"Import failed, no users were created: {exc}")
+                        else:
+                            # Kept in the session so the report survives the rerun below
+                            st.session_state.bulk_import_report = (created, rows + rejected)
+                            st.rerun()
+
+        if st.session_state.get('bulk_import_report'):
+            created, report_rows = st.session_state.bulk_import_report
+            skipped = len(report_rows) - created
+            if created:
+                st.success(f"✅ Created {created} user(s).")
+            if skipped:
+                st.warning(f"⚠️ {skipped} row(s) were not imported; see the status column.")
+
+            import pandas as pd
+            report_df = pd.DataFrame(sorted(report_rows, key=lambda row: row['line']))
+            report_df = report_df[['line', 'username', 'role', 'status']].rename(columns={
+                'line': 'Line',
+                'username': 'Username',
+                'role': 'Role',
+                'status': 'Status'
+            })
+            st.dataframe(report_df, use_container_width=True, hide_index=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                # Built on click; the passwords leave the session once downloaded
+                st.download_button("⬇️ Download Credentials Report",
+                                   lambda: download_credentials_once(report_rows),
+                                   file_name="credentials.csv", mime="text/csv", type="primary",
+                                   on_click="ignore")
+            with col2:
+                if st.button("Clear Report"):
+                    del st.session_state.bulk_import_report
+                    st.rerun()
+            st.caption("The first download contains the initial passwords; they are then dropped from this "
+                       "session. Share the report securely and do not keep copies.")
 
     with tab2:
         st.markdown("### Change User Password")
@@ -101,13 +184,17 @@ def main():
                             st.error("Password must be at least 4 characters!")
                         else:
                             user_id = user_options[selected_user_label]
-                            hashed = hash_password(new_pwd)
-                            success = update_user_password(user_id, hashed)
-
-                            if success:
-                                st.success("✅ Password changed successfully!")
+                            try:
+                                hashed = hash_password(new_pwd)
+                            except PasswordWorkerBusy:
+                                st.warning("The server is busy hashing passwords. Please try again in a moment.")
                             else:
-                                st.error("Failed to change password.")
+                                success = update_user_password(user_id, hashed)
+
+                                if success:
+                                    st.success("✅ Password changed successfully!")
+                                else:
+                                    st.error("Failed to change password.")
             else:
                 st.info("No other users to manage.")
         else:
@@ -124,16 +211,16 @@ def main():
                               and not (u['username'] == 'admin' and u['is_admin'])]
 
             if deletable_users:
-                user_options = {f"{u['username']} (ID: {u['id']})": u['id'] for u in deletable_users}
+                user_options = {f"{u['username']} (ID: {u['id']})": u for u in deletable_users}
 
                 selected_user_label = st.selectbox("Select User to Delete", options=list(user_options.keys()))
-                selected_user_id = user_options[selected_user_label]
-                selected_user = get_user_by_id(selected_user_id)
+                # Reuse the row already loaded above instead of querying it again
+                selected_user = user_options[selected_user_label]
+                selected_user_id = selected_user['id']
 
-                if selected_user:
-                    st.markdown(f"**Username:** {selected_user['username']}")
-                    st.markdown(f"**Admin:** {'Yes' if selected_user['is_admin'] else 'No'}")
-                    st.markdown(f"**Created:** {selected_user['created_at']}")
+                st.markdown(f"**Username:** {selected_user['username']}")
+                st.markdown(f"**Admin:** {'Yes' if selected_user['is_admin'] else 'No'}")
+                st.markdown(f"**Created:** {selected_user['created_at']}")
 
                 # Confirmation
                 if 'delete_user_confirm' not in st.session_state:
@@ -164,5 +251,33 @@ def main():
         else:
             st.info("No users found.")
 
+    with tab4:
+        st.markdown("### Database Backups")
+        if not backups_supported():
+            st.info("Backups are only available with the SQLite storage backend.")
+        else:
+            st.caption(f"Online backups are verified with an integrity check. The newest {BACKUP_RETENTION} are kept.")
+
+            if st.button("💾 Create Backup Now", type="primary"):
+                path = run_backup()
+                if path:
+                    st.success(f"✅ Backup created: {os.path.basename(path)}")
+                else:
+                    st.error("Backup failed the integrity check or there is no database yet.")
+
+            backups = list_backups()
+            if backups:
+                import pandas as pd
+                backup_df = pd.DataFrame(backups)[['name', 'created_at', 'size']]
+                backup_df['size'] = backup_df['size'].apply(lambda x: f"{x / 1024:.1f} KB")
+                backup_df = backup_df.rename(columns={
+                    'name': 'File',
+                    'created_at': 'Created At',
+                    'size': 'Size'
+                })
+                st.dataframe(backup_df, use_container_width=True, hide_index=True)
+            else:
+                st.info("No backups yet.")
+
 if __name__ == "__main__":
     main()
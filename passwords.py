@@ -0,0 +1,152 @@
+"""bcrypt hashing on a bounded worker pool.
+
+bcrypt releases the GIL, so a thread pool spreads hashing over the cores
+while the Streamlit script thread just waits on the result. A semaphore caps
+queued plus running jobs; past that limit callers get PasswordWorkerBusy
+instead of piling up behind a login burst.
+"""
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Fixed cost; when unset the cost is calibrated to BCRYPT_TARGET_MS
+BCRYPT_ROUNDS = int(os.environ.get('AI_TRACKER_BCRYPT_ROUNDS', 0)) or None
+BCRYPT_TARGET_MS = float(os.environ.get('AI_TRACKER_BCRYPT_TARGET_MS', 250))
+# bcrypt's own default; calibration can only raise the cost above it
+BCRYPT_MIN_ROUNDS = 12
+BCRYPT_MAX_ROUNDS = 16
+# bcrypt only reads this many bytes; bcrypt 5 rejects longer passwords
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+HASH_WORKERS = int(os.environ.get('AI_TRACKER_HASH_WORKERS', 0)) or os.cpu_count() or 1
+HASH_QUEUE_LIMIT = int(os.environ.get('AI_TRACKER_HASH_QUEUE_LIMIT', 0)) or HASH_WORKERS * 8
+HASH_QUEUE_TIMEOUT = float(os.environ.get('AI_TRACKER_HASH_QUEUE_TIMEOUT', 5))
+
+_executor = None
+_slots = threading.BoundedSemaphore(HASH_QUEUE_LIMIT)
+_pool_lock = threading.Lock()
+_pending_lock = threading.Lock()
+_pending = 0
+_rounds = BCRYPT_ROUNDS
+_calibration = None
+_calibration_lock = threading.Lock()
+
+class PasswordWorkerBusy(RuntimeError):
+    """Raised when the hashing queue stays full for HASH_QUEUE_TIMEOUT."""
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _pool_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=HASH_WORKERS,
+                                               thread_name_prefix='ai-tracker-bcrypt')
+    return _executor
+
+def _release(_future=None):
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+    _slots.release()
+
+def _submit(fn, *args, timeout=HASH_QUEUE_TIMEOUT):
+    """Queue a job, waiting up to timeout seconds for a free slot."""
+    global _pending
+    if not _slots.acquire(timeout=timeout):
+        raise PasswordWorkerBusy("Too many password operations in progress")
+    with _pending_lock:
+        _pending += 1
+    try:
+        future = _get_executor().submit(fn, *args)
+    except BaseException:
+        _release()
+        raise
+    future.add_done_callback(_release)
+    return future
+
+def calibrate_rounds(target_ms=BCRYPT_TARGET_MS):
+    """Largest cost whose hash time stays within target_ms on this machine."""
+    import bcrypt
+    start = time.perf_counter()
+    bcrypt.hashpw(b'calibration', bcrypt.gensalt(BCRYPT_MIN_ROUNDS))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    # Each extra round doubles the work
+    extra = math.floor(math.log2(target_ms / elapsed_ms)) if elapsed_ms < target_ms else 0
+    return max(BCRYPT_MIN_ROUNDS, min(BCRYPT_MAX_ROUNDS, BCRYPT_MIN_ROUNDS + extra))
+
+def _calibrate():
+    global _rounds
+    _rounds = calibrate_rounds()
+    return _rounds
+
+def start_calibration():
+    """Calibrate the cost on the worker pool in the background, once per process.
+
+    Called at app start so the first logins do not wait for it.
+    """
+    global _calibration
+    if _rounds is None and _calibration is None:
+        with _calibration_lock:
+            if _calibration is None:
+                _calibration = _get_executor().submit(_calibrate)
+
+def get_rounds():
+    """bcrypt cost for new hashes; waits for calibration if it is still running."""
+    if _rounds is None:
+        start_calibration()
+        return _calibration.result()
+    return _rounds
+
+def hash_rounds(hashed_password):
+    """Cost factor stored in a bcrypt hash ('$2b$12$...' -> 12)."""
+    try:
+        return int(hashed_password.split('$')[2])
+    except (IndexError, ValueError):
+        return 0
+
+def needs_rehash(hashed_password):
+    """True if the hash was made with a lower cost than the current one."""
+    return hash_rounds(hashed_password) < get_rounds()
+
+def _hash(password, rounds):
+    import bcrypt
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _check(password, hashed_password):
+    import bcrypt
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+def submit_hash(password, timeout=HASH_QUEUE_TIMEOUT):
+    """Queue a hash and return its Future."""
+    return _submit(_hash, password, get_rounds(), timeout=timeout)
+
+def hash_password(password):
+    """Hash a password on the worker pool."""
+    return submit_hash(password).result()
+
+def verify_password(password, hashed_password):
+    """Verify a password against its hash on the worker pool."""
+    return _submit(_check, password, hashed_password).result()
+
+def hash_passwords_bulk(passwords):
+    """Hash many passwords in parallel on a process pool, in input order.
+
+    Bulk jobs get their own short-lived pool rather than the shared one, so
+    a large import cannot fill the login queue and turn logins away.
+    """
+    if not passwords:
+        return []
+    rounds = get_rounds()
+    workers = min(HASH_WORKERS, len(passwords))
+    # The server process is multi-threaded, so workers are spawned, never forked
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        return list(pool.map(_hash, passwords, [rounds] * len(passwords),
+                             chunksize=max(1, len(passwords) // (workers * 4))))
+
+def queue_depth():
+    """Jobs currently queued or running."""
+    return _pending
@@ -0,0 +1,100 @@
+"""Bulk user provisioning from CSV.
+
+The CSV has a header row with a username column and optional role and
+password columns. Rows without a password get a generated one. Passwords
+are hashed in parallel on a process pool and all users are inserted in one
+transaction; each row's outcome ends up in a downloadable credentials report.
+"""
+import csv
+import io
+import secrets
+
+from database import create_users_bulk
+from passwords import hash_passwords_bulk, BCRYPT_MAX_PASSWORD_BYTES
+
+BULK_USER_LIMIT = 1000
+MIN_PASSWORD_LENGTH = 4
+GENERATED_PASSWORD_BYTES = 12
+ROLES = {'': 0, 'user': 0, 'admin': 1}
+REPORT_FIELDS = ['line', 'username', 'role', 'password', 'status']
+
+def generate_password():
+    """Random URL-safe password for a user without one."""
+    return secrets.token_urlsafe(GENERATED_PASSWORD_BYTES)
+
+def parse_users_csv(text):
+    """Parse a provisioning CSV into (rows, rejected) lists of report rows.
+
+    Rows are ready to provision; rejected rows already carry their error in
+    'status'. Raises ValueError if the file itself is unusable.
+    """
+    reader = csv.DictReader(io.StringIO(text.lstrip('\ufeff')))
+    fields = [name.strip().lower() for name in reader.fieldnames or []]
+    if 'username' not in fields:
+        raise ValueError("The CSV needs a header row with a 'username' column.")
+    reader.fieldnames = fields
+
+    rows = []
+    rejected = []
+    seen = set()
+    for record in reader:
+        username = (record.get('username') or '').strip()
+        role = (record.get('role') or '').strip().lower()
+        password = record.get('password') or ''
+        if not username and not role and not password:
+            continue
+        row = {'line': reader.line_num, 'username': username, 'role': role or 'user',
+               'password': password, 'generated': not password, 'status': ''}
+        if not username:
+            row['status'] = 'rejected: username is required'
+        elif username in seen:
+            row['status'] = 'rejected: duplicate username in file'
+        elif role not in ROLES:
+            row['status'] = f"rejected: unknown role '{role}' (use 'user' or 'admin')"
+        elif password and len(password) < MIN_PASSWORD_LENGTH:
+            row['status'] = f'rejected: password shorter than {MIN_PASSWORD_LENGTH} characters'
+        elif len(password.encode('utf-8')) > BCRYPT_MAX_PASSWORD_BYTES:
+            row['status'] = f'rejected: password longer than {BCRYPT_MAX_PASSWORD_BYTES} bytes'
+        seen.add(username)
+        if row['status']:
+            row['password'] = ''
+            rejected.append(row)
+            continue
+        if row['generated']:
+            row['password'] = generate_password()
+        rows.append(row)
+    if len(rows) > BULK_USER_LIMIT:
+        raise ValueError(f"At most {BULK_USER_LIMIT} users can be provisioned at once.")
+    return rows, rejected
+
+def provision_users(rows):
+    """Hash, insert and fill in each row's outcome. Returns the number created."""
+    hashes = hash_passwords_bulk([row['password'] for row in rows])
+    user_ids = create_users_bulk([
+        (row['username'], hashed, ROLES[row['role']])
+        for row, hashed in zip(rows, hashes)
+    ])
+    created = 0
+    for row, user_id in zip(rows, user_ids):
+        if user_id:
+            created += 1
+            row['status'] = 'created (generated password)' if row['generated'] else 'created'
+        else:
+            row['password'] = ''
+            row['status'] = 'conflict: username already exists'
+    return created
+
+def credentials_report(rows):
+    """CSV report of every row, including the initial passwords of new users."""
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=REPORT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    writer.writerows(sorted(rows, key=lambda row: row['line']))
+    return out.getvalue()
+
+def download_credentials_once(rows):
+    """Build the credentials report, then forget the passwords held in rows."""
+    report = credentials_report(rows)
+    for row in rows:
+        row['password'] = ''
+    return report
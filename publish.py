@@ -0,0 +1,311 @@
+"""Publish the entries catalog as a static, read-only site.
+
+    python publish.py --out site            # publish once
+    python publish.py --out site --watch 30 # republish when the data changes
+
+The bundle is plain files that any static file server can host:
+
+- index.html: client-side search, pagination and lazy video thumbnails
+- data/index.json: catalog listing plus an inverted search index
+- entries/<id>.html: one page per entry
+- manifest.json: data generation and a fingerprint per entry
+
+Only entry pages whose fingerprint changed are rewritten, and pages of
+deleted entries are removed.
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import datetime
+
+from backup import get_snapshot_backend
+from cards import extract_youtube_id
+from database import get_entries_generation, init_db
+from storage import get_backend
+
+PAGE_SIZE = 24
+SNIPPET_LENGTH = 300
+TOKEN_RE = re.compile(r'[a-z0-9]{2,}')
+
+# Published fields. Creator usernames are logins and stay out of the public bundle.
+ENTRY_FIELDS = ('id', 'website_address', 'video_link', 'description', 'remarks',
+                'created_at', 'updated_at')
+
+STYLE = """
+    body { font-family: system-ui, sans-serif; margin: 0 auto; max-width: 1100px; padding: 1rem; color: #222; }
+    h1 { color: #1E88E5; }
+    a { color: #1E88E5; text-decoration: none; }
+    a:hover { color: #1565C0; text-decoration: underline; }
+    .entry-card { background-color: #f8f9fa; padding: 1rem 1.5rem; border-radius: 10px;
+                  margin-bottom: 1rem; border-left: 4px solid #1E88E5; display: flex; gap: 1rem; }
+    .entry-card img { width: 240px; height: 135px; object-fit: cover; border-radius: 6px; flex: none; }
+    .website-header { font-size: 1.4rem; font-weight: bold; margin: 0 0 0.5rem; }
+    .meta { color: #666; font-size: 0.9rem; }
+    #search { width: 100%; font-size: 1.1rem; padding: 0.5rem; margin-bottom: 1rem; box-sizing: border-box; }
+    #pager button { margin: 0 0.25rem; }
+"""
+
+INDEX_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>AI Tracker</title>
+<style>__STYLE__</style>
+</head>
+<body>
+<h1>🤖 AI Tracker</h1>
+<input id="search" type="search" placeholder="Search websites, descriptions and remarks...">
+<p id="count" class="meta"></p>
+<div id="results"></div>
+<div id="pager"></div>
+<script>
+const PAGE_SIZE = __PAGE_SIZE__;
+let catalog = [], tokens = {}, tokenList = [], matches = [], page = 0;
+
+function escapeHtml(s) {
+  return String(s == null ? "" : s).replace(/[&<>"']/g,
+    c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"}[c]));
+}
+
+function search(query) {
+  const terms = query.toLowerCase().match(/[a-z0-9]{2,}/g);
+  if (!terms) return catalog.map((_, i) => i);
+  let result = null;
+  for (const term of terms) {
+    // Prefix match against the inverted index
+    const ids = new Set();
+    for (const token of tokenList) {
+      if (token.startsWith(term)) tokens[token].forEach(i => ids.add(i));
+    }
+    result = result === null ? ids : new Set([...result].filter(i => ids.has(i)));
+    if (!result.size) break;
+  }
+  return [...result].sort((a, b) => a - b);
+}
+
+function render() {
+  const start = page * PAGE_SIZE;
+  const shown = matches.slice(start, start + PAGE_SIZE);
+  document.getElementById("count").textContent =
+    `Showing ${shown.length ? start + 1 : 0}-${start + shown.length} of ${matches.length} entries`;
+  document.getElementById("results").innerHTML = shown.map(i => {
+    const e = catalog[i];
+    const thumb = e.youtube_id
+      ? `<img loading="lazy" alt="" src="https://i.ytimg.com/vi/${e.youtube_id}/mqdefault.jpg">` : "";
+    return `<div class="entry-card">${thumb}<div>
+      <p class="website-header"><a href="entries/${e.id}.html">${escapeHtml(e.website_address)}</a></p>
+      <p>${escapeHtml(e.description || "No description")}</p>
+      <p class="meta">${escapeHtml(e.date)}${e.remarks ? " · " + escapeHtml(e.remarks) : ""}</p>
+    </div></div>`;
+  }).join("");
+  const pages = Math.ceil(matches.length / PAGE_SIZE);
+  document.getElementById("pager").innerHTML = pages > 1
+    ? `<button ${page === 0 ? "disabled" : ""} onclick="go(-1)">‹ Prev</button>
+       Page ${page + 1} of ${pages}
+       <button ${page >= pages - 1 ? "disabled" : ""} onclick="go(1)">Next ›</button>` : "";
+}
+
+function go(delta) { page += delta; render(); window.scrollTo(0, 0); }
+
+let timer = null;
+document.getElementById("search").addEventListener("input", ev => {
+  clearTimeout(timer);
+  timer = setTimeout(() => { matches = search(ev.target.value); page = 0; render(); }, 150);
+});
+
+fetch("data/index.json").then(r => r.json()).then(data => {
+  catalog = data.entries;
+  tokens = data.tokens;
+  tokenList = Object.keys(tokens);
+  matches = catalog.map((_, i) => i);
+  render();
+});
+</script>
+</body>
+</html>
+"""
+
+ENTRY_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title} - AI Tracker</title>
+<style>{style}</style>
+</head>
+<body>
+<p><a href="../index.html">← All entries</a></p>
+<h1><a href="{url}" target="_blank" rel="noopener">{title}</a></h1>
+{video}
+<h3>Description</h3>
+<p>{description}</p>
+<h3>Remarks</h3>
+<p>{remarks}</p>
+<p class="meta">Added {created_at} · Last updated {updated_at}</p>
+</body>
+</html>
+"""
+
+def _write_file(path, content):
+    """Write atomically so a server never sees a half-written file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Unique per write, so a watcher and a manual publish never share one
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.',
+                                    suffix='.tmp', dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        # mkstemp creates the file private; published files are world-readable
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _read_file(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+def _fingerprint(entry):
+    payload = json.dumps([entry.get(f) for f in ENTRY_FIELDS], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+def _paragraphs(text, placeholder):
+    if not text:
+        return placeholder
+    return html.escape(text).replace('\n', '<br>')
+
+def render_entry_page(entry):
+    """Full HTML page for one entry."""
+    url = entry['website_address']
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    video_link = entry.get('video_link')
+    youtube_id = extract_youtube_id(video_link)
+    if youtube_id:
+        video = (f'<iframe src="https://www.youtube.com/embed/{youtube_id}" width="640" height="360" '
+                 f'style="border:0;" loading="lazy" allowfullscreen></iframe>')
+    elif video_link and video_link.lower().startswith(('http://', 'https://')):
+        # Other schemes (javascript:, data:, ...) are never published as links
+        video = f'<p><a href="{html.escape(video_link)}" target="_blank" rel="noopener">Watch Video</a></p>'
+    else:
+        video = ''
+    return ENTRY_TEMPLATE.format(
+        title=html.escape(entry['website_address']),
+        url=html.escape(url),
+        style=STYLE,
+        video=video,
+        description=_paragraphs(entry.get('description'), 'No description'),
+        remarks=_paragraphs(entry.get('remarks'), 'No remarks'),
+        created_at=html.escape(entry.get('created_at') or 'N/A'),
+        updated_at=html.escape(entry.get('updated_at') or 'N/A'),
+    )
+
+def build_index(entries):
+    """Catalog listing plus an inverted token -> positions search index."""
+    catalog = []
+    tokens = {}
+    for position, entry in enumerate(entries):
+        description = entry.get('description') or ''
+        remarks = entry.get('remarks') or ''
+        catalog.append({
+            'id': entry['id'],
+            'website_address': entry['website_address'],
+            'description': description[:SNIPPET_LENGTH],
+            'remarks': remarks[:SNIPPET_LENGTH],
+            'date': (entry.get('created_at') or '')[:10],
+            'youtube_id': extract_youtube_id(entry.get('video_link')),
+        })
+        text = ' '.join((entry['website_address'], description, remarks, entry.get('created_at') or ''))
+        for token in set(TOKEN_RE.findall(text.lower())):
+            tokens.setdefault(token, []).append(position)
+    return {'entries': catalog, 'tokens': tokens}
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, 'manifest.json')
+    if not os.path.exists(path):
+        return {'generation': None, 'entries': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def publish(out_dir, page_size=PAGE_SIZE):
+    """Publish the catalog to out_dir, rewriting only what changed.
+
+    On SQLite the catalog is read from a fresh read-only snapshot, so the
+    full scan never holds a lock on the live database.
+    """
+    source = get_snapshot_backend(max_age=0) or get_backend()
+    generation = source.get_entries_generation()
+    entries = source.get_all_entries()
+    manifest = load_manifest(out_dir)
+    old_fingerprints = manifest.get('entries', {})
+
+    fingerprints = {}
+    written = 0
+    for entry in entries:
+        key = str(entry['id'])
+        fingerprints[key] = _fingerprint(entry)
+        page_path = os.path.join(out_dir, 'entries', f'{key}.html')
+        if old_fingerprints.get(key) != fingerprints[key] or not os.path.exists(page_path):
+            _write_file(page_path, render_entry_page(entry))
+            written += 1
+
+    removed = 0
+    for key in set(old_fingerprints) - set(fingerprints):
+        page_path = os.path.join(out_dir, 'entries', f'{key}.html')
+        if os.path.exists(page_path):
+            os.remove(page_path)
+        removed += 1
+
+    index_html = INDEX_TEMPLATE.replace('__STYLE__', STYLE).replace('__PAGE_SIZE__', str(page_size))
+    index_path = os.path.join(out_dir, 'index.html')
+    if _read_file(index_path) != index_html:
+        _write_file(index_path, index_html)
+
+    if written or removed or not os.path.exists(os.path.join(out_dir, 'data', 'index.json')):
+        _write_file(os.path.join(out_dir, 'data', 'index.json'),
+                    json.dumps(build_index(entries), separators=(',', ':')))
+
+    _write_file(os.path.join(out_dir, 'manifest.json'), json.dumps({
+        'generation': generation,
+        'published_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'entries': fingerprints,
+    }, indent=1))
+    return {'generation': generation, 'entries': len(entries), 'written': written, 'removed': removed}
+
+def watch(out_dir, interval, page_size=PAGE_SIZE):
+    """Republish whenever the data generation differs from the published one."""
+    published = load_manifest(out_dir).get('generation')
+    while True:
+        generation = get_entries_generation()
+        if generation != published:
+            result = publish(out_dir, page_size)
+            published = result['generation']
+            print(f"Published generation {published}: {result['written']} pages written, "
+                  f"{result['removed']} removed")
+        time.sleep(interval)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', default='site', help="output directory")
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help="entries per page")
+    parser.add_argument('--watch', type=float, metavar='SECONDS',
+                        help="keep running and republish when the data changes")
+    args = parser.parse_args()
+    # Creates tables added since the database was last opened by the app
+    init_db()
+    if args.watch:
+        watch(args.out, args.watch, args.page_size)
+    else:
+        result = publish(args.out, args.page_size)
+        print(f"Published {result['entries']} entries to {args.out}: "
+              f"{result['written']} pages written, {result['removed']} removed")
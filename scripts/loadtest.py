@@ -0,0 +1,249 @@
+"""Drive the app headlessly with N concurrent simulated users.
+
+    python scripts/loadtest.py [--levels 1,5,10] [--rounds 3] [--entries 500]
+
+Every simulated user runs app.py and the four pages through Streamlit's
+AppTest against a seeded throwaway SQLite database: log in, filter and
+re-sort the Dashboard, add an entry, edit an entry, open the Admin page.
+For each concurrency level the script reports rerun latency percentiles per
+page and action, SQLite write-lock waits and process memory.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+PASSWORD = 'loadtest-password'
+
+def rss_mb():
+    """Current resident set size in MB."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        # ru_maxrss is the peak, in KB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def seed(n_users, n_entries):
+    """Create the schema, n_users logins and n_entries entries."""
+    from auth import hash_password
+    from database import create_entry, create_user, init_db
+    init_db()
+    hashed = hash_password(PASSWORD)
+    user_ids = [create_user(f'load{i}', hashed, is_admin=1 if i == 0 else 0) for i in range(n_users)]
+    for i in range(n_entries):
+        create_entry(
+            f'https://agent{i}.example.com',
+            'https://www.youtube.com/watch?v=dQw4w9WgXcQ' if i % 4 == 0 else None,
+            f'Agent {i} automates workflow number {i % 17}.',
+            f'batch {i % 5}' if i % 2 else None,
+            user_ids[i % n_users],
+        )
+
+class Recorder:
+    """Latency samples keyed by (page, action) for one simulated user."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def run(self, at, page, action):
+        start = time.perf_counter()
+        at.run()
+        self.samples[(page, action)].append(time.perf_counter() - start)
+        if at.exception:
+            self.errors[(page, action)] += 1
+        return at
+
+def open_page(path, session):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(ROOT, path), default_timeout=120)
+    for key, value in session.items():
+        at.session_state[key] = value
+    return at
+
+def find_button(at, label):
+    return next(b for b in at.button if b.label == label)
+
+def simulate_user(index, rounds, recorder):
+    """One user's session: log in, then browse, add and edit."""
+    username = f'load{index}'
+    at = open_page('app.py', {})
+    recorder.run(at, 'app.py', 'open')
+    at.text_input[0].input(username)
+    at.text_input[1].input(PASSWORD)
+    find_button(at, 'Login').click()
+    recorder.run(at, 'app.py', 'login')
+    session = {key: at.session_state[key] for key in ('logged_in', 'user', 'user_id', 'is_admin')}
+    if not session['logged_in']:
+        raise RuntimeError(f"{username} could not log in")
+
+    for r in range(rounds):
+        at = recorder.run(open_page('pages/1_Dashboard.py', session), 'Dashboard', 'open')
+        at.text_input(key='filter_website').input(f'agent{(index + r) % 10}')
+        find_button(at, '🔍 Apply').click()
+        recorder.run(at, 'Dashboard', 'filter')
+        at.selectbox(key='sort_by').select('Website')
+        find_button(at, '🔍 Apply').click()
+        recorder.run(at, 'Dashboard', 'sort')
+
+        at = recorder.run(open_page('pages/2_Add_Entry.py', session), 'Add Entry', 'open')
+        at.text_input[0].input(f'https://load{index}-{r}.example.com')
+        at.text_area[0].input(f'Added by {username} in round {r}')
+        find_button(at, '💾 Save Entry').click()
+        recorder.run(at, 'Add Entry', 'save')
+
+        at = recorder.run(open_page('pages/3_Edit_Entry.py', session), 'Edit Entry', 'open')
+        at.text_area[1].input(f'Edited by {username} in round {r}')
+        find_button(at, '💾 Update Entry').click()
+        recorder.run(at, 'Edit Entry', 'update')
+
+        if session['is_admin']:
+            recorder.run(open_page('pages/4_Admin.py', session), 'Admin', 'open')
+
+def user_process(index, rounds, start_at):
+    """Entry point of one simulated user's process."""
+    from streamlit.testing.v1 import AppTest  # noqa: F401  (import before the clock starts)
+    from storage import get_backend
+    recorder = Recorder()
+    peak_rss = rss_mb()
+    done = threading.Event()
+
+    def sample_memory():
+        nonlocal peak_rss
+        while not done.wait(0.2):
+            peak_rss = max(peak_rss, rss_mb())
+
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+    time.sleep(max(0.0, start_at - time.time()))
+    failure = None
+    try:
+        simulate_user(index, rounds, recorder)
+    except Exception as exc:
+        failure = f"user {index}: {exc!r}"
+    done.set()
+    sampler.join()
+    return {
+        'samples': dict(recorder.samples),
+        'errors': dict(recorder.errors),
+        'locks': get_backend().lock_stats(),
+        'peak_rss_mb': max(peak_rss, rss_mb()),
+        'failure': failure,
+    }
+
+def run_level(concurrency, rounds):
+    """Run concurrency users at once, one process each.
+
+    AppTest keeps global runtime state, so simulated users cannot share a
+    process; every user gets its own interpreter and they all start together.
+    """
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    locks = defaultdict(float)
+    max_wait = 0.0
+    rss = []
+    failures = []
+
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=concurrency, mp_context=ctx) as pool:
+        # Give every interpreter time to start and import before the clock runs
+        start_at = time.time() + 5 + concurrency * 0.5
+        futures = [pool.submit(user_process, i, rounds, start_at) for i in range(concurrency)]
+        results = [f.result() for f in futures]
+
+    for result in results:
+        for key, values in result['samples'].items():
+            samples[key].extend(values)
+        for key, count in result['errors'].items():
+            errors[key] += count
+        for key in ('writes', 'waited', 'wait_seconds'):
+            locks[key] += result['locks'][key]
+        max_wait = max(max_wait, result['locks']['max_wait_seconds'])
+        rss.append(result['peak_rss_mb'])
+        if result['failure']:
+            failures.append(result['failure'])
+
+    return {
+        'concurrency': concurrency,
+        'reruns': sum(len(v) for v in samples.values()),
+        'latency_ms': {
+            f'{page} / {action}': {
+                'count': len(values),
+                'p50': percentile(values, 50) * 1000,
+                'p95': percentile(values, 95) * 1000,
+                'p99': percentile(values, 99) * 1000,
+                'errors': errors[(page, action)],
+            }
+            for (page, action), values in sorted(samples.items())
+        },
+        'lock_waits': {
+            'writes': int(locks['writes']),
+            'waited': int(locks['waited']),
+            'wait_ms': locks['wait_seconds'] * 1000,
+            'max_wait_ms': max_wait * 1000,
+        },
+        'peak_rss_mb_per_user': max(rss) if rss else 0.0,
+        'peak_rss_mb_total': sum(rss),
+        'failures': failures,
+    }
+
+def print_report(result):
+    print(f"\n=== {result['concurrency']} concurrent users: {result['reruns']} reruns ===")
+    print(f"{'page / action':<28}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, row in result['latency_ms'].items():
+        print(f"{name:<28}{row['count']:>6}{row['p50']:>10.1f}{row['p95']:>10.1f}"
+              f"{row['p99']:>10.1f}{row['errors']:>8}")
+    locks = result['lock_waits']
+    print(f"SQLite writes {locks['writes']}, waited on lock {locks['waited']}, "
+          f"total wait {locks['wait_ms']:.1f}ms, max wait {locks['max_wait_ms']:.1f}ms")
+    print(f"Memory: peak RSS {result['peak_rss_mb_per_user']:.0f} MB per user process, "
+          f"{result['peak_rss_mb_total']:.0f} MB total")
+    for failure in result['failures']:
+        print(f"FAILED {failure}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--levels', default='1,5,10', help="comma-separated numbers of concurrent users")
+    parser.add_argument('--rounds', type=int, default=3, help="browse/add/edit rounds per user")
+    parser.add_argument('--entries', type=int, default=500, help="entries in the seeded database")
+    parser.add_argument('--json', action='store_true', help="print raw results as JSON")
+    args = parser.parse_args()
+    levels = [int(n) for n in args.levels.split(',')]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Must be set before the app modules are imported
+        os.environ['AI_TRACKER_DATABASE_PATH'] = os.path.join(tmp_dir, 'loadtest.db')
+        os.environ['AI_TRACKER_STORAGE'] = 'sqlite'
+        seed(max(levels), args.entries)
+
+        results = []
+        for level in levels:
+            result = run_level(level, args.rounds)
+            results.append(result)
+            if not args.json:
+                print_report(result)
+        if args.json:
+            print(json.dumps(results, indent=2))
+    return 1 if any(r['failures'] for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
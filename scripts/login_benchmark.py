@@ -0,0 +1,98 @@
+"""Measure login throughput at increasing concurrency.
+
+    python scripts/login_benchmark.py [--levels 1,2,4,8,16] [--duration 5]
+
+Runs auth.authenticate() from N client threads against an in-memory user
+store, so the numbers reflect the bcrypt worker pool rather than SQLite.
+Reports logins per second, latency percentiles and how many attempts were
+turned away because the hashing queue was full.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import passwords
+from auth import authenticate
+from passwords import PasswordWorkerBusy
+from storage import set_backend
+from storage.memory import MemoryBackend
+
+N_USERS = 50
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def run_level(concurrency, duration):
+    latencies = []
+    rejected = 0
+    failed = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(index):
+        nonlocal rejected, failed
+        i = index
+        while time.perf_counter() < deadline:
+            username = f'user{i % N_USERS}'
+            start = time.perf_counter()
+            try:
+                user = authenticate(username, f'password-{username}')
+            except PasswordWorkerBusy:
+                with lock:
+                    rejected += 1
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                if user:
+                    latencies.append(elapsed)
+                else:
+                    failed += 1
+            i += concurrency
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    return {
+        'logins_per_sec': len(latencies) / wall,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'rejected': rejected,
+        'failed': failed,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--levels', default='1,2,4,8,16', help="comma-separated client thread counts")
+    parser.add_argument('--duration', type=float, default=5.0, help="seconds per level")
+    args = parser.parse_args()
+
+    backend = MemoryBackend()
+    set_backend(backend)
+    rounds = passwords.get_rounds()
+    print(f"bcrypt cost {rounds}, {passwords.HASH_WORKERS} workers, "
+          f"queue limit {passwords.HASH_QUEUE_LIMIT}, {os.cpu_count()} CPUs")
+
+    for i in range(N_USERS):
+        username = f'user{i}'
+        backend.create_user(username, passwords.hash_password(f'password-{username}'))
+
+    print(f"{'clients':>8}{'logins/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'rejected':>10}{'failed':>8}")
+    for level in [int(n) for n in args.levels.split(',')]:
+        r = run_level(level, args.duration)
+        print(f"{level:>8}{r['logins_per_sec']:>10.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+              f"{r['rejected']:>10}{r['failed']:>8}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""Measure module import and first-render times for every page.
+
+    python scripts/measure_startup.py [--check] [--render-budget-ms 1500]
+
+Each measurement runs in a fresh interpreter against a throwaway SQLite
+database, so "cold" numbers include every import the page triggers and
+"warm" numbers are a second rerun in the same process. With --check the
+script exits non-zero when a budget is exceeded or a heavy module (pandas,
+bcrypt) is loaded on a path that should not need it, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+PAGES = [
+    'app.py',
+    'pages/1_Dashboard.py',
+    'pages/2_Add_Entry.py',
+    'pages/3_Edit_Entry.py',
+    'pages/4_Admin.py',
+]
+SCENARIOS = ['anonymous', 'empty', 'seeded']
+APP_MODULES = ['storage', 'database', 'auth', 'backup']
+HEAVY_MODULES = ['pandas', 'numpy', 'bcrypt']
+
+# (page, scenario) -> heavy modules that must stay unloaded on that path
+MUST_NOT_LOAD = {(page, 'anonymous'): ['pandas', 'bcrypt'] for page in PAGES}
+# app.py starts the bcrypt cost calibration on the hashing pool at start-up;
+# it runs off the render path, so only pandas is ruled out there
+MUST_NOT_LOAD[('app.py', 'anonymous')] = ['pandas']
+MUST_NOT_LOAD[('pages/1_Dashboard.py', 'empty')] = ['pandas', 'bcrypt']
+MUST_NOT_LOAD[('pages/2_Add_Entry.py', 'empty')] = ['pandas', 'bcrypt']
+MUST_NOT_LOAD[('pages/3_Edit_Entry.py', 'empty')] = ['pandas', 'bcrypt']
+
+def seed_database(path, n_entries):
+    """Create the schema, an admin user and n_entries entries."""
+    from storage.sqlite import SQLiteBackend
+    backend = SQLiteBackend(path)
+    backend.init_schema()
+    # A placeholder hash: pages never verify it, and app.py must not re-hash
+    admin_id = backend.create_user('admin', '$2b$12$' + 'x' * 53, is_admin=1)
+    for i in range(n_entries):
+        backend.create_entry(
+            f'https://agent{i}.example.com',
+            'https://www.youtube.com/watch?v=dQw4w9WgXcQ' if i % 2 else None,
+            f'Agent number {i} does things.',
+            'seeded' if i % 3 else None,
+            admin_id,
+        )
+
+def worker_imports():
+    """Cold and warm import time of the app modules, after streamlit."""
+    import importlib
+    import streamlit  # noqa: F401  (baseline cost every page pays)
+    results = {}
+    for name in APP_MODULES:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        importlib.import_module(name)
+        warm = time.perf_counter() - start
+        results[name] = {'cold_ms': cold * 1000, 'warm_ms': warm * 1000}
+    results['heavy_loaded'] = [m for m in HEAVY_MODULES if m in sys.modules]
+    return results
+
+def worker_render(page, scenario):
+    """Cold first render and warm rerun of one page."""
+    from streamlit.testing.v1 import AppTest
+    before = set(sys.modules)
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=120)
+    if scenario != 'anonymous':
+        at.session_state.logged_in = True
+        at.session_state.user = 'admin'
+        at.session_state.user_id = 1
+        at.session_state.is_admin = True
+
+    start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - start
+    heavy_loaded = [m for m in HEAVY_MODULES if m in sys.modules and m not in before]
+
+    start = time.perf_counter()
+    at.run()
+    warm = time.perf_counter() - start
+    return {
+        'cold_ms': cold * 1000,
+        'warm_ms': warm * 1000,
+        'heavy_loaded': heavy_loaded,
+        'exception': [e.message for e in at.exception],
+    }
+
+def run_worker(args, db_path):
+    env = dict(os.environ, AI_TRACKER_DATABASE_PATH=db_path, AI_TRACKER_STORAGE='sqlite')
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--worker', *args],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--check', action='store_true', help="exit non-zero on budget violations")
+    parser.add_argument('--import-budget-ms', type=float, default=100.0,
+                        help="max cold import time of each app module, after streamlit")
+    parser.add_argument('--render-budget-ms', type=float, default=1500.0,
+                        help="max cold first-render time of a page")
+    parser.add_argument('--entries', type=int, default=200, help="entries in the seeded scenario")
+    parser.add_argument('--json', action='store_true', help="print raw results as JSON")
+    parser.add_argument('--worker', nargs='+', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        if args.worker[0] == 'imports':
+            result = worker_imports()
+        else:
+            result = worker_render(*args.worker)
+        print(json.dumps(result))
+        return 0
+
+    violations = []
+    results = {'imports': None, 'pages': []}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_paths = {}
+        for scenario in SCENARIOS:
+            db_paths[scenario] = os.path.join(tmp_dir, f'{scenario}.db')
+            seed_database(db_paths[scenario], args.entries if scenario == 'seeded' else 0)
+
+        imports = results['imports'] = run_worker(['imports'], db_paths['empty'])
+        for name in APP_MODULES:
+            if imports[name]['cold_ms'] > args.import_budget_ms:
+                violations.append(f"import {name}: {imports[name]['cold_ms']:.0f}ms > {args.import_budget_ms:.0f}ms")
+        for module in imports['heavy_loaded']:
+            violations.append(f"importing the app modules loaded {module}")
+
+        for page in PAGES:
+            for scenario in SCENARIOS:
+                result = run_worker([page, scenario], db_paths[scenario])
+                result.update(page=page, scenario=scenario)
+                results['pages'].append(result)
+                if result['exception']:
+                    violations.append(f"{page} [{scenario}] raised: {result['exception']}")
+                if result['cold_ms'] > args.render_budget_ms:
+                    violations.append(f"{page} [{scenario}] first render {result['cold_ms']:.0f}ms "
+                                      f"> {args.render_budget_ms:.0f}ms")
+                for module in MUST_NOT_LOAD.get((page, scenario), []):
+                    if module in result['heavy_loaded']:
+                        violations.append(f"{page} [{scenario}] loaded {module}")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'module':<24}{'cold ms':>10}{'warm ms':>10}")
+        for name in APP_MODULES:
+            print(f"{name:<24}{imports[name]['cold_ms']:>10.1f}{imports[name]['warm_ms']:>10.3f}")
+        print()
+        print(f"{'page':<24}{'scenario':<12}{'cold ms':>10}{'warm ms':>10}  heavy modules loaded")
+        for r in results['pages']:
+            print(f"{r['page']:<24}{r['scenario']:<12}{r['cold_ms']:>10.1f}{r['warm_ms']:>10.1f}  "
+                  f"{', '.join(r['heavy_loaded']) or '-'}")
+
+    if violations:
+        print()
+        for violation in violations:
+            print(f"BUDGET: {violation}")
+    return 1 if args.check and violations else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
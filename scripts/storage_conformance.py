@@ -0,0 +1,219 @@
+"""Run the storage conformance checks and a small benchmark on every backend.
+
+    python scripts/storage_conformance.py [--entries 2000]
+
+Checks the sqlite, memory and generic dbapi backends (the latter driven
+through the sqlite3 module). If AI_TRACKER_DBAPI_MODULE is set, the
+configured DB-API engine is checked as well. Exits non-zero on any failure.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from storage import DBAPI_MODULE, create_backend
+from storage.memory import MemoryBackend
+from storage.sql import DBAPIBackend
+from storage.sqlite import SQLiteBackend, SCHEMA as SQLITE_SCHEMA
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+def check_users(backend):
+    admin_id = backend.create_user('conf_admin', 'hash-a', is_admin=1)
+    user_id = backend.create_user('conf_user', 'hash-u')
+    check(admin_id and user_id and admin_id != user_id, "create_user returns distinct IDs")
+    check(backend.create_user('conf_user', 'other') is None, "duplicate username returns None")
+
+    bulk_ids = backend.create_users_bulk([('bulk_a', 'h', 0), ('conf_user', 'h', 0), ('bulk_b', 'h', 1)])
+    check(len(bulk_ids) == 3 and bulk_ids[1] is None, "create_users_bulk reports conflicts per row")
+    check(bulk_ids[0] and bulk_ids[2], "create_users_bulk creates the other rows")
+    check(backend.get_user_by_username('bulk_b')['is_admin'] == 1, "create_users_bulk stores roles")
+    for bulk_id in bulk_ids[0], bulk_ids[2]:
+        backend.delete_user(bulk_id)
+
+    user = backend.get_user_by_username('conf_user')
+    check(user['id'] == user_id and user['password'] == 'hash-u', "get_user_by_username")
+    check(user['is_admin'] == 0, "is_admin defaults to 0")
+    check(isinstance(user['created_at'], str) and len(user['created_at']) == 19, "created_at format")
+    check(backend.get_user_by_id(admin_id)['username'] == 'conf_admin', "get_user_by_id")
+    check(backend.get_user_by_username('missing') is None, "unknown username returns None")
+    check(backend.get_user_by_id(-1) is None, "unknown ID returns None")
+
+    all_users = backend.get_all_users()
+    check({u['username'] for u in all_users} >= {'conf_admin', 'conf_user'}, "get_all_users")
+    check(all('password' not in u for u in all_users), "get_all_users hides passwords")
+
+    check(backend.update_user_password(user_id, 'hash-2'), "update_user_password")
+    check(backend.get_user_by_id(user_id)['password'] == 'hash-2', "password updated")
+    check(not backend.update_user_password(-1, 'x'), "update of unknown user returns False")
+    check(not backend.replace_user_password(user_id, 'stale', 'hash-3'), "replace with a stale hash is refused")
+    check(backend.replace_user_password(user_id, 'hash-2', 'hash-3'), "replace_user_password")
+    check(backend.get_user_by_id(user_id)['password'] == 'hash-3', "password replaced")
+
+    check(backend.delete_user(user_id)['id'] == user_id, "delete_user returns the deleted row")
+    check(backend.get_user_by_username('conf_user') is None, "deleted user is gone")
+    check(backend.delete_user(user_id) is None, "second delete returns None")
+    return admin_id
+
+def check_entries(backend, admin_id):
+    first = backend.create_entry('a.example', None, 'first', None, admin_id)
+    second = backend.create_entry('b.example', 'https://youtu.be/abcdefghijk', 'second', 'note', admin_id)
+    check(first and second and first != second, "create_entry returns distinct IDs")
+
+    entry = backend.get_entry_by_id(second)
+    check(entry['website_address'] == 'b.example' and entry['remarks'] == 'note', "get_entry_by_id")
+    check(entry['created_by'] == admin_id, "created_by stored")
+    check(backend.get_entry_by_id(-1) is None, "unknown entry returns None")
+
+    rows = {e['id']: e for e in backend.get_all_entries()}
+    check(first in rows and second in rows, "get_all_entries")
+    check(rows[first]['creator_name'] == 'conf_admin', "creator_name joined")
+
+    chunked = []
+    for names, chunk in backend.iter_entry_chunks(1):
+        check(len(chunk) == 1, "iter_entry_chunks respects chunk_size")
+        chunked.extend(dict(zip(names, row)) for row in chunk)
+    check(chunked == backend.get_all_entries(), "iter_entry_chunks matches get_all_entries")
+
+    generation = backend.get_entries_generation()
+    before = backend.get_entry_by_id(first)
+    check(backend.update_entry(first, 'c.example', 'v', 'd', 'r') == before, "update_entry returns the old row")
+    check(backend.get_entries_generation() != generation, "generation changes on an update in the same second")
+    generation = backend.get_entries_generation()
+    updated = backend.get_entry_by_id(first)
+    check((updated['website_address'], updated['video_link'], updated['description'], updated['remarks'])
+          == ('c.example', 'v', 'd', 'r'), "entry fields updated")
+    check(backend.update_entry(-1, 'x', None, None, None) is None, "update of unknown entry returns None")
+
+    check(backend.delete_entry(first) == updated, "delete_entry returns the deleted row")
+    check(backend.get_entries_generation() != generation, "generation changes on writes")
+    check(backend.get_entry_by_id(first) is None, "deleted entry is gone")
+    check(backend.delete_entry(first) is None, "second delete returns None")
+
+def check_saved_searches(backend, admin_id):
+    entry_id = backend.create_entry('s.example', None, 'saved', None, admin_id)
+    in_search = lambda entry: entry['website_address'].startswith('s.')
+    search_id = backend.create_saved_search(admin_id, 'conf search', '{"filter_website": "s."}', in_search)
+    check(search_id, "create_saved_search returns an ID")
+    searches = backend.get_saved_searches(admin_id)
+    check([s['id'] for s in searches] == [search_id], "get_saved_searches for a user")
+    check(searches[0]['filters'] == '{"filter_website": "s."}', "filters stored verbatim")
+    check(search_id in {s['id'] for s in backend.get_saved_searches()}, "get_saved_searches for everybody")
+    check(backend.get_saved_search_result_ids(search_id) == {entry_id}, "initial results scanned")
+    check(backend.count_new_saved_search_results(admin_id) == {}, "initial results are not new")
+
+    other_id = backend.create_entry('s.other.example', None, 'saved', None, admin_id)
+    backend.refresh_saved_search_matches(other_id, {search_id: in_search})
+    backend.refresh_saved_search_matches(other_id, {search_id: in_search})
+    check(backend.get_saved_search_result_ids(search_id) == {entry_id, other_id},
+          "refresh_saved_search_matches adds")
+    backend.refresh_saved_search_matches(other_id, {})
+    check(backend.get_saved_search_result_ids(search_id) == {entry_id, other_id},
+          "refresh_saved_search_matches leaves other searches alone")
+    backend.update_entry(entry_id, 't.example', None, 'saved', None)
+    backend.refresh_saved_search_matches(entry_id, {search_id: in_search})
+    check(backend.get_saved_search_result_ids(search_id) == {other_id}, "refresh_saved_search_matches removes")
+    check(backend.mark_saved_search_visited(search_id), "mark_saved_search_visited")
+
+    backend.delete_entry(other_id)
+    check(backend.get_saved_search_result_ids(search_id) == set(), "deleted entry leaves the results")
+    check(backend.delete_saved_search(search_id), "delete_saved_search")
+    check(backend.get_saved_searches(admin_id) == [], "deleted search is gone")
+    check(not backend.delete_saved_search(search_id), "second delete returns False")
+    backend.delete_entry(entry_id)
+
+def check_audit_log(backend, admin_id):
+    entry_id = backend.create_entry('h.example', None, 'history', None, admin_id)
+    entry = backend.get_entry_by_id(entry_id)
+    backend.append_audit_records([
+        ('entries', entry_id, 'create', admin_id, None, '{"v": 1}', '2000-01-01 00:00:00'),
+        ('entries', entry_id, 'update', admin_id, '{"v": 1}', '{"v": 2}', '2000-01-02 00:00:00'),
+        ('entries', entry_id, 'update', None, '{"v": 2}', '{"v": 3}', '2999-01-01 00:00:00'),
+        ('users', admin_id, 'password', admin_id, None, None, '2000-01-01 00:00:00'),
+    ])
+    history = backend.get_audit_history('entries', entry_id, 10)
+    check([r['action'] for r in history] == ['update', 'update', 'create'], "get_audit_history newest first")
+    check(history[0]['after_data'] == '{"v": 3}' and history[0]['actor_id'] is None, "audit images stored")
+    check(len(backend.get_audit_history('entries', entry_id, 1)) == 1, "get_audit_history respects limit")
+    check(backend.get_recent_audit_records('users', 'password', 10)[0]['row_id'] == admin_id,
+          "get_recent_audit_records")
+
+    check(backend.compact_audit_log('2500-01-01 00:00:00', 1) == 1, "compact_audit_log respects limit")
+    check(backend.compact_audit_log('2500-01-01 00:00:00', 10) == 1, "compact_audit_log finishes")
+    check([r['action'] for r in backend.get_audit_history('entries', entry_id, 10)] == ['update'],
+          "compaction keeps recent history")
+    check(len(backend.get_audit_history('users', admin_id, 10)) == 1, "compaction keeps the newest record")
+
+    backend.delete_entry(entry_id)
+    check(backend.restore_entry(entry) == entry_id, "restore_entry")
+    restored = backend.get_entry_by_id(entry_id)
+    check(restored['created_at'] == entry['created_at'] and restored['description'] == 'history',
+          "restored entry keeps its fields")
+    check(backend.restore_entry(entry) is None, "restoring an existing entry returns None")
+    backend.delete_entry(entry_id)
+
+def benchmark(backend, n_entries):
+    user_id = backend.create_user('bench_user', 'hash')
+    timings = {}
+
+    start = time.perf_counter()
+    ids = [backend.create_entry(f'site{i}.example', None, f'description {i}', None, user_id)
+           for i in range(n_entries)]
+    timings['create_entry'] = (time.perf_counter() - start) / n_entries
+
+    start = time.perf_counter()
+    for entry_id in ids:
+        backend.get_entry_by_id(entry_id)
+    timings['get_entry_by_id'] = (time.perf_counter() - start) / n_entries
+
+    start = time.perf_counter()
+    for _ in range(200):
+        backend.get_user_by_username('bench_user')
+    timings['get_user_by_username'] = (time.perf_counter() - start) / 200
+
+    start = time.perf_counter()
+    rows = backend.get_all_entries()
+    timings['get_all_entries'] = time.perf_counter() - start
+    check(len(rows) >= n_entries, "benchmark entries all returned")
+    return timings
+
+def backends(tmp_dir):
+    yield 'sqlite', SQLiteBackend(os.path.join(tmp_dir, 'sqlite.db'))
+    yield 'memory', MemoryBackend()
+    generic = DBAPIBackend(sqlite3, os.path.join(tmp_dir, 'dbapi.db'))
+    generic.schema = SQLITE_SCHEMA
+    yield 'dbapi (sqlite3)', generic
+    if DBAPI_MODULE:
+        yield f'dbapi ({DBAPI_MODULE})', create_backend('dbapi')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=2000, help="entries created by the benchmark")
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for label, backend in backends(tmp_dir):
+            try:
+                backend.init_schema()
+                admin_id = check_users(backend)
+                check_entries(backend, admin_id)
+                check_saved_searches(backend, admin_id)
+                check_audit_log(backend, admin_id)
+                timings = benchmark(backend, args.entries)
+            except Exception as exc:
+                failures += 1
+                print(f"FAIL {label}: {exc!r}")
+                continue
+            summary = ', '.join(f"{name} {seconds * 1e6:.0f}us" for name, seconds in timings.items())
+            print(f"ok   {label}: {summary}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
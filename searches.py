@@ -0,0 +1,39 @@
+"""Saved Dashboard searches.
+
+A saved search stores the Dashboard filter values under their widget keys,
+plus a materialized set of matching entry IDs. The set is kept current by
+evaluating every saved search against each created or updated entry, so
+nothing re-scans the table to find new matches.
+"""
+
+# Dashboard filter widget key -> entry column it matches
+FILTER_FIELDS = {
+    'filter_website': 'website_address',
+    'filter_desc': 'description',
+    'filter_remarks': 'remarks',
+    'filter_date': 'created_at',
+}
+SORT_KEYS = ('sort_by', 'sort_order')
+SEARCH_KEYS = tuple(FILTER_FIELDS) + SORT_KEYS
+
+def has_filters(filters):
+    """True if at least one filter is set (sorting alone selects everything)."""
+    return any(filters.get(key) for key in FILTER_FIELDS)
+
+def entry_matches(filters, entry):
+    """Whether an entry dict passes the filters.
+
+    Mirrors filtered_order() on the Dashboard: text filters are
+    case-insensitive substrings, the date filter a plain substring.
+    """
+    for key, column in FILTER_FIELDS.items():
+        value = filters.get(key)
+        if not value:
+            continue
+        text = entry.get(column) or ''
+        if key == 'filter_date':
+            if value not in text:
+                return False
+        elif value.upper() not in text.upper():
+            return False
+    return True
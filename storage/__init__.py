@@ -0,0 +1,52 @@
+"""Storage backends for users and entries.
+
+The backend is chosen with AI_TRACKER_STORAGE:
+
+- ``sqlite`` (default): the data/app.db file
+- ``memory``: process-local dicts, for tests and ephemeral demos
+- ``dbapi``: any PEP 249 driver named by AI_TRACKER_DBAPI_MODULE,
+  connected with the AI_TRACKER_DBAPI_DSN string
+"""
+import os
+import threading
+
+from storage.base import StorageBackend
+
+STORAGE_BACKEND = os.environ.get('AI_TRACKER_STORAGE', 'sqlite')
+DBAPI_MODULE = os.environ.get('AI_TRACKER_DBAPI_MODULE')
+DBAPI_DSN = os.environ.get('AI_TRACKER_DBAPI_DSN')
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def create_backend(name):
+    """Build a backend by name from the environment configuration."""
+    if name == 'sqlite':
+        from database import DATABASE_PATH
+        from storage.sqlite import SQLiteBackend
+        return SQLiteBackend(DATABASE_PATH)
+    if name == 'memory':
+        from storage.memory import MemoryBackend
+        return MemoryBackend()
+    if name == 'dbapi':
+        from storage.sql import DBAPIBackend
+        if not DBAPI_MODULE:
+            raise ValueError("AI_TRACKER_DBAPI_MODULE must be set for the dbapi backend")
+        args = (DBAPI_DSN,) if DBAPI_DSN else ()
+        return DBAPIBackend(DBAPI_MODULE, *args)
+    raise ValueError(f"Unknown storage backend: {name}")
+
+def get_backend():
+    """Get the process-wide storage backend."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(STORAGE_BACKEND)
+    return _backend
+
+def set_backend(backend):
+    """Replace the process-wide storage backend (tests, demos, tools)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
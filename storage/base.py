@@ -0,0 +1,168 @@
+from datetime import datetime, timezone
+
+def current_timestamp():
+    """Timestamp string in the same format as SQLite's CURRENT_TIMESTAMP (UTC)."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+class StorageBackend:
+    """Repository interface for users and entries.
+
+    Rows are returned as plain dicts with the same keys as the SQLite schema,
+    and timestamps as 'YYYY-MM-DD HH:MM:SS' strings, whatever the engine.
+    """
+
+    name = None
+
+    def init_schema(self):
+        """Create tables if they do not exist."""
+        raise NotImplementedError
+
+    # ============== User Operations ==============
+
+    def get_user_by_username(self, username):
+        """Get a user by username, or None."""
+        raise NotImplementedError
+
+    def get_user_by_id(self, user_id):
+        """Get a user by ID, or None."""
+        raise NotImplementedError
+
+    def get_all_users(self):
+        """Get all users (without password hashes), newest first."""
+        raise NotImplementedError
+
+    def create_user(self, username, hashed_password, is_admin=0):
+        """Create a user. Returns the new ID, or None if the username exists."""
+        raise NotImplementedError
+
+    def create_users_bulk(self, users):
+        """Create (username, hashed_password, is_admin) users in one transaction.
+
+        Returns one new ID per input row, or None where the username was taken.
+        """
+        raise NotImplementedError
+
+    def update_user_password(self, user_id, hashed_password):
+        """Update a user's password. Returns True if the user exists."""
+        raise NotImplementedError
+
+    def replace_user_password(self, user_id, expected_hash, hashed_password):
+        """Update a password only if it is still expected_hash.
+
+        Returns True if it was replaced.
+        """
+        raise NotImplementedError
+
+    def delete_user(self, user_id):
+        """Delete a user and their saved searches.
+
+        Returns the deleted row, read in the same write transaction, or None.
+        """
+        raise NotImplementedError
+
+    # ============== Entry Operations ==============
+
+    def get_all_entries(self):
+        """Get all entries with their creator_name, newest first."""
+        raise NotImplementedError
+
+    def iter_entry_chunks(self, chunk_size):
+        """Yield (column_names, rows) for all entries, newest first.
+
+        Same rows as get_all_entries(), but as tuples in chunks of at most
+        chunk_size, so callers can build columns without per-row dicts.
+        """
+        raise NotImplementedError
+
+    def get_entries_generation(self):
+        """Cheap token that changes whenever entries are added, edited or deleted."""
+        raise NotImplementedError
+
+    def get_entry_by_id(self, entry_id):
+        """Get an entry by ID, or None."""
+        raise NotImplementedError
+
+    def create_entry(self, website_address, video_link, description, remarks, created_by):
+        """Create an entry. Returns the new ID."""
+        raise NotImplementedError
+
+    def restore_entry(self, entry):
+        """Re-insert a deleted entry dict under its original ID.
+
+        Returns the ID, or None if an entry with that ID exists.
+        """
+        raise NotImplementedError
+
+    def update_entry(self, entry_id, website_address, video_link, description, remarks):
+        """Update an entry. Returns the row as it was before, or None if missing.
+
+        The old row is read in the same write transaction as the update.
+        """
+        raise NotImplementedError
+
+    def delete_entry(self, entry_id):
+        """Delete an entry and its saved search results.
+
+        Returns the deleted row, read in the same write transaction, or None.
+        """
+        raise NotImplementedError
+
+    # ============== Saved Searches ==============
+
+    def create_saved_search(self, user_id, name, filters, matches):
+        """Store a search (filters as a JSON string) and return its ID.
+
+        Its initial results are every entry for which matches(entry) is true,
+        found in the same write transaction so no concurrent entry write is
+        missed. The search counts as visited now, so they are not new.
+        """
+        raise NotImplementedError
+
+    def get_saved_searches(self, user_id=None):
+        """Saved searches of one user, or of everybody if user_id is None."""
+        raise NotImplementedError
+
+    def delete_saved_search(self, search_id):
+        """Delete a saved search and its results."""
+        raise NotImplementedError
+
+    def mark_saved_search_visited(self, search_id):
+        """Reset the search's 'new since last visit' point to now."""
+        raise NotImplementedError
+
+    def get_saved_search_result_ids(self, search_id):
+        """Set of entry IDs currently matching a saved search."""
+        raise NotImplementedError
+
+    def count_new_saved_search_results(self, user_id):
+        """{search_id: results matched since the last visit} for a user."""
+        raise NotImplementedError
+
+    def refresh_saved_search_matches(self, entry_id, matchers):
+        """Re-evaluate one entry against {search_id: matches(entry)} predicates.
+
+        The entry is read in the same write transaction as the update. Only
+        the given searches are touched; existing memberships keep their
+        matched_at and new ones get the current time.
+        """
+        raise NotImplementedError
+
+    # ============== Audit Log ==============
+
+    def append_audit_records(self, records):
+        """Append (table_name, row_id, action, actor_id, before_data, after_data,
+        created_at) records in one transaction. Images are JSON strings."""
+        raise NotImplementedError
+
+    def get_audit_history(self, table_name, row_id, limit):
+        """Newest first audit records of one row."""
+        raise NotImplementedError
+
+    def get_recent_audit_records(self, table_name, action, limit):
+        """Newest first audit records of a table with the given action."""
+        raise NotImplementedError
+
+    def compact_audit_log(self, cutoff, limit):
+        """Delete up to limit records older than cutoff that are not the
+        newest record of their row. Returns the number deleted."""
+        raise NotImplementedError
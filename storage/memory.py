@@ -0,0 +1,290 @@
+import threading
+
+from storage.base import StorageBackend, current_timestamp
+
+ENTRY_FIELDS = ('id', 'website_address', 'video_link', 'description', 'remarks',
+                'created_at', 'updated_at', 'created_by')
+
+class MemoryBackend(StorageBackend):
+    """Process-local backend for tests and ephemeral demo instances.
+
+    Users and entries live in dicts keyed by ID (insertion ordered, so they
+    double as the creation-ordered array), with a username -> ID index.
+    """
+
+    name = 'memory'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.users = {}
+        self.usernames = {}
+        self.entries = {}
+        self._next_user_id = 1
+        self._next_entry_id = 1
+        self._generation = 0
+        self.saved_searches = {}
+        # search_id -> {entry_id: matched_at}
+        self.saved_search_results = {}
+        self._next_search_id = 1
+        self.audit_log = []
+        self._next_audit_id = 1
+
+    def init_schema(self):
+        pass
+
+    # ============== User Operations ==============
+
+    def get_user_by_username(self, username):
+        with self._lock:
+            user_id = self.usernames.get(username)
+            return dict(self.users[user_id]) if user_id is not None else None
+
+    def get_user_by_id(self, user_id):
+        with self._lock:
+            user = self.users.get(user_id)
+            return dict(user) if user else None
+
+    def get_all_users(self):
+        with self._lock:
+            return [{'id': u['id'], 'username': u['username'],
+                     'is_admin': u['is_admin'], 'created_at': u['created_at']}
+                    for u in reversed(self.users.values())]
+
+    def create_user(self, username, hashed_password, is_admin=0):
+        with self._lock:
+            if username in self.usernames:
+                return None
+            user_id = self._next_user_id
+            self._next_user_id += 1
+            self.users[user_id] = {
+                'id': user_id,
+                'username': username,
+                'password': hashed_password,
+                'is_admin': is_admin,
+                'created_at': current_timestamp(),
+            }
+            self.usernames[username] = user_id
+            return user_id
+
+    def create_users_bulk(self, users):
+        with self._lock:
+            return [self.create_user(username, hashed_password, is_admin)
+                    for username, hashed_password, is_admin in users]
+
+    def update_user_password(self, user_id, hashed_password):
+        with self._lock:
+            user = self.users.get(user_id)
+            if not user:
+                return False
+            user['password'] = hashed_password
+            return True
+
+    def replace_user_password(self, user_id, expected_hash, hashed_password):
+        with self._lock:
+            user = self.users.get(user_id)
+            if not user or user['password'] != expected_hash:
+                return False
+            user['password'] = hashed_password
+            return True
+
+    def delete_user(self, user_id):
+        with self._lock:
+            user = self.users.pop(user_id, None)
+            if not user:
+                return None
+            del self.usernames[user['username']]
+            for search in list(self.saved_searches.values()):
+                if search['user_id'] == user_id:
+                    self.delete_saved_search(search['id'])
+            return dict(user)
+
+    # ============== Entry Operations ==============
+
+    def _with_creator(self, entry):
+        row = dict(entry)
+        creator = self.users.get(entry['created_by'])
+        row['creator_name'] = creator['username'] if creator else None
+        return row
+
+    def get_all_entries(self):
+        with self._lock:
+            return [self._with_creator(e) for e in reversed(self.entries.values())]
+
+    def iter_entry_chunks(self, chunk_size):
+        with self._lock:
+            entries = list(reversed(self.entries.values()))
+        names = list(ENTRY_FIELDS) + ['creator_name']
+        for start in range(0, len(entries), chunk_size):
+            chunk = []
+            for entry in entries[start:start + chunk_size]:
+                creator = self.users.get(entry['created_by'])
+                chunk.append(tuple(entry[f] for f in ENTRY_FIELDS)
+                             + (creator['username'] if creator else None,))
+            yield names, chunk
+
+    def get_entries_generation(self):
+        with self._lock:
+            return f"{len(self.entries)}:{self._generation}"
+
+    def get_entry_by_id(self, entry_id):
+        with self._lock:
+            entry = self.entries.get(entry_id)
+            return dict(entry) if entry else None
+
+    def create_entry(self, website_address, video_link, description, remarks, created_by):
+        with self._lock:
+            entry_id = self._next_entry_id
+            self._next_entry_id += 1
+            self._generation += 1
+            now = current_timestamp()
+            self.entries[entry_id] = {
+                'id': entry_id,
+                'website_address': website_address,
+                'video_link': video_link,
+                'description': description,
+                'remarks': remarks,
+                'created_at': now,
+                'updated_at': now,
+                'created_by': created_by,
+            }
+            return entry_id
+
+    def restore_entry(self, entry):
+        with self._lock:
+            if entry['id'] in self.entries:
+                return None
+            self._generation += 1
+            self._next_entry_id = max(self._next_entry_id, entry['id'] + 1)
+            self.entries[entry['id']] = {f: entry[f] for f in ENTRY_FIELDS}
+            self.entries[entry['id']]['updated_at'] = current_timestamp()
+            # Keep the dict in creation order
+            self.entries = dict(sorted(self.entries.items()))
+            return entry['id']
+
+    def update_entry(self, entry_id, website_address, video_link, description, remarks):
+        with self._lock:
+            entry = self.entries.get(entry_id)
+            if not entry:
+                return None
+            before = dict(entry)
+            self._generation += 1
+            entry.update(
+                website_address=website_address,
+                video_link=video_link,
+                description=description,
+                remarks=remarks,
+                updated_at=current_timestamp(),
+            )
+            return before
+
+    def delete_entry(self, entry_id):
+        with self._lock:
+            entry = self.entries.pop(entry_id, None)
+            if entry is None:
+                return None
+            self._generation += 1
+            for results in self.saved_search_results.values():
+                results.pop(entry_id, None)
+            return dict(entry)
+
+    # ============== Saved Searches ==============
+
+    def create_saved_search(self, user_id, name, filters, matches):
+        with self._lock:
+            search_id = self._next_search_id
+            self._next_search_id += 1
+            now = current_timestamp()
+            self.saved_searches[search_id] = {
+                'id': search_id,
+                'user_id': user_id,
+                'name': name,
+                'filters': filters,
+                'last_visited_at': now,
+                'created_at': now,
+            }
+            self.saved_search_results[search_id] = {
+                entry_id: now for entry_id, entry in self.entries.items() if matches(dict(entry))
+            }
+            return search_id
+
+    def get_saved_searches(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                return [dict(s) for s in self.saved_searches.values()]
+            searches = [dict(s) for s in self.saved_searches.values() if s['user_id'] == user_id]
+        return sorted(searches, key=lambda s: s['name'])
+
+    def delete_saved_search(self, search_id):
+        with self._lock:
+            self.saved_search_results.pop(search_id, None)
+            return self.saved_searches.pop(search_id, None) is not None
+
+    def mark_saved_search_visited(self, search_id):
+        with self._lock:
+            search = self.saved_searches.get(search_id)
+            if not search:
+                return False
+            search['last_visited_at'] = current_timestamp()
+            return True
+
+    def get_saved_search_result_ids(self, search_id):
+        with self._lock:
+            return set(self.saved_search_results.get(search_id, ()))
+
+    def count_new_saved_search_results(self, user_id):
+        with self._lock:
+            counts = {}
+            for search in self.saved_searches.values():
+                if search['user_id'] != user_id:
+                    continue
+                n = sum(1 for matched_at in self.saved_search_results[search['id']].values()
+                        if matched_at > search['last_visited_at'])
+                if n:
+                    counts[search['id']] = n
+            return counts
+
+    def refresh_saved_search_matches(self, entry_id, matchers):
+        with self._lock:
+            entry = self.entries.get(entry_id)
+            now = current_timestamp()
+            for search_id, matches in matchers.items():
+                results = self.saved_search_results.get(search_id)
+                if results is None:
+                    continue
+                if entry and matches(dict(entry)):
+                    results.setdefault(entry_id, now)
+                else:
+                    results.pop(entry_id, None)
+
+    # ============== Audit Log ==============
+
+    def append_audit_records(self, records):
+        fields = ('table_name', 'row_id', 'action', 'actor_id', 'before_data', 'after_data', 'created_at')
+        with self._lock:
+            for record in records:
+                self.audit_log.append(dict(zip(fields, record), id=self._next_audit_id))
+                self._next_audit_id += 1
+
+    def get_audit_history(self, table_name, row_id, limit):
+        with self._lock:
+            records = [dict(r) for r in reversed(self.audit_log)
+                       if r['table_name'] == table_name and r['row_id'] == row_id]
+        return records[:limit]
+
+    def get_recent_audit_records(self, table_name, action, limit):
+        with self._lock:
+            records = [dict(r) for r in reversed(self.audit_log)
+                       if r['table_name'] == table_name and r['action'] == action]
+        return records[:limit]
+
+    def compact_audit_log(self, cutoff, limit):
+        with self._lock:
+            newest = {(r['table_name'], r['row_id']): r['id'] for r in self.audit_log}
+            doomed = set()
+            for r in self.audit_log:
+                if len(doomed) >= limit:
+                    break
+                if r['created_at'] < cutoff and r['id'] != newest[(r['table_name'], r['row_id'])]:
+                    doomed.add(r['id'])
+            self.audit_log = [r for r in self.audit_log if r['id'] not in doomed]
+            return len(doomed)
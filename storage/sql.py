@@ -0,0 +1,495 @@
+import importlib
+import os
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from storage.base import StorageBackend
+
+# Idle connections kept for reuse, so a networked engine does not pay a
+# connect and login on every query
+DB_POOL_SIZE = int(os.environ.get('AI_TRACKER_DB_POOL_SIZE', 5))
+
+# DDL shared by every SQL backend; only the id column syntax differs. The
+# generic backend's SQL targets PostgreSQL: SQL:2003 identity columns,
+# CREATE INDEX IF NOT EXISTS, RETURNING and LIMIT inside subqueries.
+SCHEMA_TEMPLATE = [
+    '''
+    CREATE TABLE IF NOT EXISTS users (
+        id {id_column},
+        username VARCHAR(255) UNIQUE NOT NULL,
+        password VARCHAR(255) NOT NULL,
+        is_admin INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS entries (
+        id {id_column},
+        website_address TEXT NOT NULL,
+        video_link TEXT,
+        description TEXT,
+        remarks TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        created_by INTEGER,
+        FOREIGN KEY (created_by) REFERENCES users(id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS counters (
+        name VARCHAR(64) PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS saved_searches (
+        id {id_column},
+        user_id INTEGER NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        filters TEXT NOT NULL,
+        last_visited_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS saved_search_results (
+        search_id INTEGER NOT NULL,
+        entry_id INTEGER NOT NULL,
+        matched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (search_id, entry_id)
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_saved_searches_user ON saved_searches (user_id)',
+    'CREATE INDEX IF NOT EXISTS idx_saved_search_results_entry ON saved_search_results (entry_id)',
+    '''
+    CREATE TABLE IF NOT EXISTS audit_log (
+        id {id_column},
+        table_name VARCHAR(32) NOT NULL,
+        row_id INTEGER NOT NULL,
+        action VARCHAR(32) NOT NULL,
+        actor_id INTEGER,
+        before_data TEXT,
+        after_data TEXT,
+        created_at TIMESTAMP NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_audit_log_row ON audit_log (table_name, row_id, id)',
+    'CREATE INDEX IF NOT EXISTS idx_audit_log_created ON audit_log (created_at)',
+]
+
+def build_schema(id_column):
+    """The schema statements with the given id column definition."""
+    return [statement.format(id_column=id_column) for statement in SCHEMA_TEMPLATE]
+
+SCHEMA = build_schema('INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY')
+
+ENTRIES_QUERY = '''
+    SELECT e.*, u.username as creator_name
+    FROM entries e
+    LEFT JOIN users u ON e.created_by = u.id
+    ORDER BY e.created_at DESC, e.id DESC
+'''
+
+def _convert_placeholders(query, paramstyle):
+    """Rewrite '?' placeholders for the driver's paramstyle."""
+    if paramstyle == 'qmark':
+        return query
+    parts = query.split('?')
+    if paramstyle in ('format', 'pyformat'):
+        return '%s'.join(parts)
+    if paramstyle == 'numeric':
+        out = parts[0]
+        for i, part in enumerate(parts[1:], start=1):
+            out += f':{i}{part}'
+        return out
+    raise ValueError(f"Unsupported DB-API paramstyle: {paramstyle}")
+
+def _normalize(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    return value
+
+class DBAPIBackend(StorageBackend):
+    """Backend for any PEP 249 driver, e.g. psycopg2.
+
+    Queries are written with '?' placeholders and rewritten for the driver's
+    paramstyle. New IDs come from INSERT ... RETURNING id.
+    """
+
+    name = 'dbapi'
+    schema = SCHEMA
+    returning_id = True
+
+    def __init__(self, module, *connect_args, **connect_kwargs):
+        if isinstance(module, str):
+            module = importlib.import_module(module)
+        self.module = module
+        self.connect_args = connect_args
+        self.connect_kwargs = connect_kwargs
+        self._queries = {}
+        self._pool = []
+        self._pool_lock = threading.Lock()
+
+    def _connect(self):
+        return self.module.connect(*self.connect_args, **self.connect_kwargs)
+
+    @contextmanager
+    def connection(self):
+        """Context manager for a pooled database connection."""
+        with self._pool_lock:
+            conn = self._pool.pop() if self._pool else None
+        if conn is None:
+            conn = self._connect()
+        try:
+            yield conn
+            # Ends the transaction drivers open implicitly for reads
+            conn.rollback()
+        except BaseException:
+            self._discard(conn)
+            raise
+        with self._pool_lock:
+            if len(self._pool) < DB_POOL_SIZE:
+                self._pool.append(conn)
+                return
+        conn.close()
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except self.module.Error:
+            pass
+
+    def _sql(self, query):
+        sql = self._queries.get(query)
+        if sql is None:
+            sql = self._queries[query] = _convert_placeholders(query, self.module.paramstyle)
+        return sql
+
+    def _execute(self, cursor, query, params=()):
+        cursor.execute(self._sql(query), params)
+
+    def _rows(self, cursor):
+        names = [d[0] for d in cursor.description]
+        return [{name: _normalize(value) for name, value in zip(names, row)}
+                for row in cursor.fetchall()]
+
+    def _tuples(self, rows):
+        return [tuple(_normalize(value) for value in row) for row in rows]
+
+    def _query(self, query, params=()):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            self._execute(cursor, query, params)
+            return self._rows(cursor)
+
+    def _query_one(self, query, params=()):
+        rows = self._query(query, params)
+        return rows[0] if rows else None
+
+    def _begin_write(self, conn):
+        """Hook run before each write transaction; drivers begin implicitly."""
+
+    def _write(self, query, params=()):
+        """Run a write statement and return the affected row count."""
+        with self.connection() as conn:
+            self._begin_write(conn)
+            cursor = conn.cursor()
+            self._execute(cursor, query, params)
+            conn.commit()
+            return cursor.rowcount
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction yielding a cursor; commits on success."""
+        with self.connection() as conn:
+            self._begin_write(conn)
+            cursor = conn.cursor()
+            try:
+                yield cursor
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def _insert_returning_id(self, cursor, query, params=()):
+        if self.returning_id:
+            self._execute(cursor, query + ' RETURNING id', params)
+            return cursor.fetchone()[0]
+        self._execute(cursor, query, params)
+        return cursor.lastrowid
+
+    def _insert(self, query, params=()):
+        """Run an INSERT and return the new row's ID."""
+        with self.transaction() as cursor:
+            return self._insert_returning_id(cursor, query, params)
+
+    def init_schema(self):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            for statement in self.schema:
+                cursor.execute(statement)
+            self._execute(cursor, 'SELECT value FROM counters WHERE name = ?', ('entries',))
+            if cursor.fetchone() is None:
+                self._execute(cursor, 'INSERT INTO counters (name, value) VALUES (?, 0)', ('entries',))
+            conn.commit()
+
+    def _bump_entries_version(self, cursor):
+        """Count an entry write, inside the write's own transaction."""
+        self._execute(cursor, 'UPDATE counters SET value = value + 1 WHERE name = ?', ('entries',))
+
+    def _lock_row(self, cursor, table, row_id):
+        """Row-lock a row inside a write transaction and return it, or None."""
+        # A no-op UPDATE locks the row on every engine; SQLite already holds
+        # the database write lock from _begin_write
+        self._execute(cursor, f'UPDATE {table} SET id = id WHERE id = ?', (row_id,))
+        if cursor.rowcount <= 0:
+            return None
+        self._execute(cursor, f'SELECT * FROM {table} WHERE id = ?', (row_id,))
+        return self._rows(cursor)[0]
+
+    # ============== User Operations ==============
+
+    def get_user_by_username(self, username):
+        return self._query_one('SELECT * FROM users WHERE username = ?', (username,))
+
+    def get_user_by_id(self, user_id):
+        return self._query_one('SELECT * FROM users WHERE id = ?', (user_id,))
+
+    def get_all_users(self):
+        return self._query('SELECT id, username, is_admin, created_at FROM users ORDER BY created_at DESC')
+
+    def create_user(self, username, hashed_password, is_admin=0):
+        try:
+            return self._insert(
+                'INSERT INTO users (username, password, is_admin) VALUES (?, ?, ?)',
+                (username, hashed_password, is_admin)
+            )
+        except self.module.IntegrityError:
+            return None
+
+    def create_users_bulk(self, users):
+        ids = []
+        with self.transaction() as cursor:
+            for username, hashed_password, is_admin in users:
+                # A savepoint per row lets a conflict skip just that row
+                cursor.execute('SAVEPOINT bulk_user')
+                try:
+                    user_id = self._insert_returning_id(
+                        cursor,
+                        'INSERT INTO users (username, password, is_admin) VALUES (?, ?, ?)',
+                        (username, hashed_password, is_admin)
+                    )
+                except self.module.IntegrityError:
+                    cursor.execute('ROLLBACK TO SAVEPOINT bulk_user')
+                    user_id = None
+                cursor.execute('RELEASE SAVEPOINT bulk_user')
+                ids.append(user_id)
+        return ids
+
+    def update_user_password(self, user_id, hashed_password):
+        return self._write(
+            'UPDATE users SET password = ? WHERE id = ?',
+            (hashed_password, user_id)
+        ) > 0
+
+    def replace_user_password(self, user_id, expected_hash, hashed_password):
+        return self._write(
+            'UPDATE users SET password = ? WHERE id = ? AND password = ?',
+            (hashed_password, user_id, expected_hash)
+        ) > 0
+
+    def delete_user(self, user_id):
+        with self.transaction() as cursor:
+            before = self._lock_row(cursor, 'users', user_id)
+            if before is None:
+                return None
+            self._execute(cursor, '''
+                DELETE FROM saved_search_results
+                WHERE search_id IN (SELECT id FROM saved_searches WHERE user_id = ?)
+            ''', (user_id,))
+            self._execute(cursor, 'DELETE FROM saved_searches WHERE user_id = ?', (user_id,))
+            self._execute(cursor, 'DELETE FROM users WHERE id = ?', (user_id,))
+            return before
+
+    # ============== Entry Operations ==============
+
+    def get_all_entries(self):
+        return self._query(ENTRIES_QUERY)
+
+    def iter_entry_chunks(self, chunk_size):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                self._execute(cursor, ENTRIES_QUERY)
+                names = [d[0] for d in cursor.description]
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield names, self._tuples(rows)
+            finally:
+                # A pooled connection must not keep an unfinished read open
+                cursor.close()
+
+    def get_entries_generation(self):
+        # The write counter changes on every entry write, even several per second
+        row = self._query_one('''
+            SELECT (SELECT COUNT(*) FROM entries) AS n, value AS version
+            FROM counters WHERE name = ?
+        ''', ('entries',))
+        return f"{row['n']}:{row['version']}"
+
+    def get_entry_by_id(self, entry_id):
+        return self._query_one('SELECT * FROM entries WHERE id = ?', (entry_id,))
+
+    def create_entry(self, website_address, video_link, description, remarks, created_by):
+        with self.transaction() as cursor:
+            entry_id = self._insert_returning_id(cursor, '''
+                INSERT INTO entries (website_address, video_link, description, remarks, created_by)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (website_address, video_link, description, remarks, created_by))
+            self._bump_entries_version(cursor)
+            return entry_id
+
+    def restore_entry(self, entry):
+        try:
+            with self.transaction() as cursor:
+                self._execute(cursor, '''
+                    INSERT INTO entries (id, website_address, video_link, description, remarks,
+                                         created_at, updated_at, created_by)
+                    VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, ?)
+                ''', (entry['id'], entry['website_address'], entry['video_link'], entry['description'],
+                      entry['remarks'], entry['created_at'], entry['created_by']))
+                self._bump_entries_version(cursor)
+        except self.module.IntegrityError:
+            return None
+        return entry['id']
+
+
+    def update_entry(self, entry_id, website_address, video_link, description, remarks):
+        with self.transaction() as cursor:
+            before = self._lock_row(cursor, 'entries', entry_id)
+            if before is None:
+                return None
+            self._execute(cursor, '''
+                UPDATE entries
+                SET website_address = ?, video_link = ?, description = ?, remarks = ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (website_address, video_link, description, remarks, entry_id))
+            self._bump_entries_version(cursor)
+            return before
+
+    def delete_entry(self, entry_id):
+        with self.transaction() as cursor:
+            before = self._lock_row(cursor, 'entries', entry_id)
+            if before is None:
+                return None
+            self._execute(cursor, 'DELETE FROM saved_search_results WHERE entry_id = ?', (entry_id,))
+            self._execute(cursor, 'DELETE FROM entries WHERE id = ?', (entry_id,))
+            self._bump_entries_version(cursor)
+            return before
+
+    # ============== Saved Searches ==============
+
+    def create_saved_search(self, user_id, name, filters, matches):
+        with self.transaction() as cursor:
+            search_id = self._insert_returning_id(
+                cursor,
+                'INSERT INTO saved_searches (user_id, name, filters) VALUES (?, ?, ?)',
+                (user_id, name, filters)
+            )
+            self._execute(cursor, 'SELECT * FROM entries')
+            entry_ids = [entry['id'] for entry in self._rows(cursor) if matches(entry)]
+            if entry_ids:
+                # matched_at equals last_visited_at, so no initial result counts
+                # as new however long the scan took
+                cursor.executemany(self._sql('''
+                    INSERT INTO saved_search_results (search_id, entry_id, matched_at)
+                    SELECT id, ?, last_visited_at FROM saved_searches WHERE id = ?
+                '''), [(entry_id, search_id) for entry_id in entry_ids])
+            return search_id
+
+    def get_saved_searches(self, user_id=None):
+        if user_id is None:
+            return self._query('SELECT * FROM saved_searches ORDER BY id')
+        return self._query('SELECT * FROM saved_searches WHERE user_id = ? ORDER BY name', (user_id,))
+
+    def delete_saved_search(self, search_id):
+        with self.transaction() as cursor:
+            self._execute(cursor, 'DELETE FROM saved_search_results WHERE search_id = ?', (search_id,))
+            self._execute(cursor, 'DELETE FROM saved_searches WHERE id = ?', (search_id,))
+            return cursor.rowcount > 0
+
+    def mark_saved_search_visited(self, search_id):
+        return self._write(
+            'UPDATE saved_searches SET last_visited_at = CURRENT_TIMESTAMP WHERE id = ?',
+            (search_id,)
+        ) > 0
+
+    def get_saved_search_result_ids(self, search_id):
+        rows = self._query('SELECT entry_id FROM saved_search_results WHERE search_id = ?', (search_id,))
+        return {row['entry_id'] for row in rows}
+
+    def count_new_saved_search_results(self, user_id):
+        rows = self._query('''
+            SELECT s.id AS search_id, COUNT(r.entry_id) AS n
+            FROM saved_searches s
+            JOIN saved_search_results r ON r.search_id = s.id AND r.matched_at > s.last_visited_at
+            WHERE s.user_id = ?
+            GROUP BY s.id
+        ''', (user_id,))
+        return {row['search_id']: row['n'] for row in rows}
+
+    def refresh_saved_search_matches(self, entry_id, matchers):
+        with self.transaction() as cursor:
+            self._execute(cursor, 'SELECT * FROM entries WHERE id = ?', (entry_id,))
+            rows = self._rows(cursor)
+            search_ids = {search_id for search_id, matches in matchers.items() if rows and matches(rows[0])}
+            self._execute(cursor, 'SELECT search_id FROM saved_search_results WHERE entry_id = ?', (entry_id,))
+            current = {row[0] for row in cursor.fetchall()}
+            for search_id in (current & set(matchers)) - search_ids:
+                self._execute(cursor, 'DELETE FROM saved_search_results WHERE search_id = ? AND entry_id = ?',
+                              (search_id, entry_id))
+            for search_id in search_ids - current:
+                self._execute(cursor, 'INSERT INTO saved_search_results (search_id, entry_id) VALUES (?, ?)',
+                              (search_id, entry_id))
+
+    # ============== Audit Log ==============
+
+    def append_audit_records(self, records):
+        with self.transaction() as cursor:
+            cursor.executemany(self._sql('''
+                INSERT INTO audit_log (table_name, row_id, action, actor_id, before_data, after_data, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            '''), records)
+
+    def get_audit_history(self, table_name, row_id, limit):
+        return self._query('''
+            SELECT * FROM audit_log
+            WHERE table_name = ? AND row_id = ?
+            ORDER BY id DESC LIMIT ?
+        ''', (table_name, row_id, limit))
+
+    def get_recent_audit_records(self, table_name, action, limit):
+        return self._query('''
+            SELECT * FROM audit_log
+            WHERE table_name = ? AND action = ?
+            ORDER BY id DESC LIMIT ?
+        ''', (table_name, action, limit))
+
+    def compact_audit_log(self, cutoff, limit):
+        # The newest record per row is found through idx_audit_log_row
+        return self._write('''
+            DELETE FROM audit_log WHERE id IN (
+                SELECT a.id FROM audit_log a
+                WHERE a.created_at < ?
+                  AND a.id < (SELECT MAX(b.id) FROM audit_log b
+                              WHERE b.table_name = a.table_name AND b.row_id = a.row_id)
+                ORDER BY a.id LIMIT ?
+            )
+        ''', (cutoff, limit))
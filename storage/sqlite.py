@@ -0,0 +1,64 @@
+import os
+import sqlite3
+import threading
+import time
+
+from storage.sql import DBAPIBackend, build_schema
+
+SCHEMA = build_schema('INTEGER PRIMARY KEY AUTOINCREMENT')
+
+# Lock acquisitions slower than this count as having waited on another writer
+LOCK_WAIT_THRESHOLD = 0.001
+
+class SQLiteBackend(DBAPIBackend):
+    """Backend for a single SQLite database file."""
+
+    name = 'sqlite'
+    schema = SCHEMA
+    returning_id = False
+
+    def __init__(self, path, read_only=False):
+        super().__init__(sqlite3, path)
+        self.path = path
+        self.read_only = read_only
+        self._lock_stats_lock = threading.Lock()
+        self._lock_stats = {'writes': 0, 'waited': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+
+    def _connect(self):
+        if self.read_only:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            return conn
+        data_dir = os.path.dirname(self.path)
+        if data_dir and not os.path.exists(data_dir):
+            os.makedirs(data_dir)
+        # Pooled connections move between threads, one user at a time
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _begin_write(self, conn):
+        # Take the write lock up front so the time spent waiting for it
+        # (busy handler included) can be measured.
+        start = time.perf_counter()
+        conn.execute('BEGIN IMMEDIATE')
+        waited = time.perf_counter() - start
+        with self._lock_stats_lock:
+            stats = self._lock_stats
+            stats['writes'] += 1
+            stats['wait_seconds'] += waited
+            stats['max_wait_seconds'] = max(stats['max_wait_seconds'], waited)
+            if waited > LOCK_WAIT_THRESHOLD:
+                stats['waited'] += 1
+
+    def lock_stats(self):
+        """Write-lock acquisition counters since start-up."""
+        with self._lock_stats_lock:
+            return dict(self._lock_stats)
+
+    def _rows(self, cursor):
+        return [dict(row) for row in cursor.fetchall()]
+
+    def _tuples(self, rows):
+        # SQLite already returns text timestamps; rows index like tuples
+        return rows